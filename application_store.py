@@ -0,0 +1,208 @@
+# application_store.py (indexed, concurrency-safe application log)
+import atexit
+import csv
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+# -------------------- CONFIG -------------------- #
+DB_FILE = "applications.sqlite3"
+LEGACY_CSV_FILE = "application_log.csv"
+BATCH_SIZE = 200                 # rows per write transaction
+FLUSH_INTERVAL = 0.25            # seconds a partial batch may wait
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+COLUMNS = ["First Name", "Last Name", "Email", "Job URL", "Portal", "Status", "Timestamp"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY,
+    first_name TEXT,
+    last_name TEXT,
+    email TEXT,
+    job_url TEXT,
+    portal TEXT,
+    status TEXT,
+    success INTEGER NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_applications_portal ON applications (portal);
+CREATE INDEX IF NOT EXISTS idx_applications_success ON applications (success);
+CREATE INDEX IF NOT EXISTS idx_applications_status ON applications (status);
+CREATE INDEX IF NOT EXISTS idx_applications_timestamp ON applications (timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_INSERT = (
+    "INSERT INTO applications (first_name, last_name, email, job_url, portal, status, success, timestamp) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def _row(first_name, last_name, email, job_url, portal, status, timestamp=None):
+    status = str(status)
+    return (first_name, last_name, email, job_url, portal, status, int(status.startswith("Success")),
+            timestamp or datetime.now().strftime(TIMESTAMP_FORMAT))
+
+def _legacy_lines(csv_path):
+    # The old log was written with the platform's default encoding: UTF-8 on
+    # Linux/macOS, cp1252 on Windows. Decode line by line, so a file appended
+    # to from both still imports instead of failing on the first odd byte.
+    with open(csv_path, "rb") as f:
+        for raw in f:
+            try:
+                yield raw.decode("utf-8-sig")
+            except UnicodeDecodeError:
+                yield raw.decode("cp1252", errors="replace")
+
+# -------------------- Store -------------------- #
+class ApplicationStore:
+    """SQLite (WAL) application log with a single background writer.
+
+    `log` only enqueues the row; the writer thread commits rows in batches,
+    so many parallel appliers never interleave partial rows and never wait
+    on disk. WAL mode lets the dashboard read while the writer commits, and
+    other processes (CLI, both Streamlit apps) share the same file safely.
+    """
+
+    def __init__(self, path=DB_FILE, legacy_csv=LEGACY_CSV_FILE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        conn = _connect(path)
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        conn.close()
+        if legacy_csv:
+            self.migrate_csv(legacy_csv)
+        self._writer = threading.Thread(target=self._write_loop, name="application-log-writer", daemon=True)
+        self._writer.start()
+
+    # ---------- writing ---------- #
+    def log(self, first_name, last_name, email, job_url, portal, status, timestamp=None):
+        self._queue.put(_row(first_name, last_name, email, job_url, portal, status, timestamp))
+
+    def flush(self):
+        """Block until every row logged so far is committed."""
+        self._queue.join()
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                pass
+            rows = [row for row in batch if row is not None]
+            try:
+                if rows:
+                    with conn:
+                        conn.executemany(_INSERT, rows)
+            except sqlite3.Error as e:
+                print(f"❌ Failed to write {len(rows)} application log rows: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if None in batch:
+                conn.close()
+                return
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    # ---------- migration ---------- #
+    def migrate_csv(self, csv_path=LEGACY_CSV_FILE):
+        """Import the legacy CSV log once; later calls (from any process) are no-ops."""
+        if not os.path.exists(csv_path):
+            return 0
+        key = f"migrated:{os.path.abspath(csv_path)}"
+        conn = _connect(self.path)
+        try:
+            if conn.execute("SELECT 1 FROM meta WHERE name = ?", (key,)).fetchone():
+                return 0
+            rows = [
+                _row(*(record.get(column) for column in COLUMNS[:6]), timestamp=record.get("Timestamp"))
+                for record in csv.DictReader(_legacy_lines(csv_path))
+            ]
+            # Take the write lock before re-checking, so two processes starting
+            # at once cannot both import the file.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("SELECT 1 FROM meta WHERE name = ?", (key,)).fetchone():
+                    conn.rollback()
+                    return 0
+                conn.executemany(_INSERT, rows)
+                conn.execute("INSERT INTO meta (name, value) VALUES (?, ?)", (key, str(len(rows))))
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            print(f"📦 Migrated {len(rows)} rows from {csv_path} into {self.path}")
+            return len(rows)
+        finally:
+            conn.close()
+
+    # ---------- reading ---------- #
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+        return conn
+
+    def query(self, sql, params=()):
+        return self._reader().execute(sql, params).fetchall()
+
+    def count(self):
+        return self.query("SELECT COUNT(*) FROM applications")[0][0]
+
+    def summary(self):
+        total, successes, portals = self.query(
+            "SELECT COUNT(*), COALESCE(SUM(success), 0), COUNT(DISTINCT portal) FROM applications"
+        )[0]
+        return {"total": total, "successful": successes, "failed": total - successes, "portals": portals}
+
+    def portal_counts(self):
+        return self.query("SELECT portal, COUNT(*) FROM applications GROUP BY portal ORDER BY COUNT(*) DESC")
+
+    def recent(self, limit=100, offset=0):
+        return self.query(
+            "SELECT first_name, last_name, email, job_url, portal, status, timestamp FROM applications "
+            "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+
+    def successful_urls(self, after_id=0):
+        """(id, job_url) of successful applications with id > after_id, oldest first."""
+        return self.query(
+            "SELECT id, job_url FROM applications WHERE success = 1 AND id > ? ORDER BY id", (after_id,)
+        )
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_store():
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ApplicationStore()
+            atexit.register(_default_store.close)
+    return _default_store
+
+def log_application(first_name, last_name, email, job_url, portal, status):
+    get_store().log(first_name, last_name, email, job_url, portal, status)
@@ -0,0 +1,250 @@
+# batch_apply.py (resumable batch applications from a file of job URLs)
+import argparse
+import csv
+import json
+import os
+import time
+from application_store import get_store, log_application
+from job_search_ai_agent import generate_cover_letter, tailor_resume
+from llm_pipeline import new_pipeline
+from multi_portal_bot import detect_portal, route_applications
+from resume_ingest import extract_resume_text
+
+# -------------------- CONFIG -------------------- #
+CHECKPOINT_EVERY = 20            # completed jobs between checkpoint writes
+CHECKPOINT_INTERVAL = 10.0       # ...or seconds, whichever comes first
+PROGRESS_EVERY = 25              # completed jobs between throughput reports
+URL_COLUMNS = ("url", "job_url", "Job URL", "link")
+
+# -------------------- Input -------------------- #
+def _job_from_record(record):
+    url = next((record[column] for column in URL_COLUMNS if record.get(column)), None)
+    if not url:
+        return None
+    return {
+        "url": url.strip(),
+        "title": record.get("title") or "",
+        "company": record.get("company") or "",
+        "description": record.get("description") or "",
+        "source": record.get("source") or "batch",
+    }
+
+def read_jobs(path):
+    """Yield (index, job) for each record of a CSV, JSONL or plain URL-list file.
+
+    Records are read one at a time, so the file can be arbitrarily large.
+    `index` counts every record (including unusable ones, which yield None)
+    so it stays stable across runs over the same file.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if extension == ".csv":
+            records = csv.DictReader(f)
+        elif extension in (".jsonl", ".ndjson"):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = ({"url": line.strip()} for line in f if line.strip() and not line.startswith("#"))
+        for index, record in enumerate(records):
+            if isinstance(record, str):
+                record = {"url": record}
+            yield index, _job_from_record(record)
+
+# -------------------- Checkpoint -------------------- #
+class BatchCheckpoint:
+    """Progress of one batch file: a contiguous watermark plus the few indexes done above it.
+
+    Jobs finish out of order, but never more than the in-flight window ahead
+    of the watermark, so the checkpoint stays small however long the batch.
+    Jobs marked with `retry=True` (e.g. generation failed on a rate limit or a
+    missing API key) still advance the watermark but are kept in `retry`, so
+    the next run over the same file picks them up again.
+    """
+
+    def __init__(self, path, input_path):
+        self.path = path
+        self.input_path = os.path.abspath(input_path)
+        self.watermark = 0
+        self.done = set()
+        self.retry = set()
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("input") == self.input_path:
+                self.watermark = state["watermark"]
+                self.done = set(state.get("done", []))
+                self.retry = set(state.get("retry", []))
+            else:
+                print(f"⚠️ Checkpoint {path} belongs to {state.get('input')}; starting from the top.")
+
+    def is_done(self, index):
+        return (index < self.watermark or index in self.done) and index not in self.retry
+
+    def mark(self, index, retry=False):
+        if retry:
+            self.retry.add(index)
+        else:
+            self.retry.discard(index)
+        if index >= self.watermark:          # retried jobs sit below it already
+            self.done.add(index)
+        while self.watermark in self.done:
+            self.done.remove(self.watermark)
+            self.watermark += 1
+        self._unsaved += 1
+        if self._unsaved >= CHECKPOINT_EVERY or time.monotonic() - self._saved_at >= CHECKPOINT_INTERVAL:
+            self.save()
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"input": self.input_path, "watermark": self.watermark, "done": sorted(self.done),
+                       "retry": sorted(self.retry)}, f)
+        os.replace(tmp_path, self.path)
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+
+# -------------------- Batch Run -------------------- #
+def run_batch(input_path, resume_path, first_name, last_name, email, output_path=None, concurrency=4,
+              requests_per_minute=None, tokens_per_minute=None, browser_workers=None, review=False, tailor=False):
+    """Detect, generate and fill every job in `input_path`, resuming from its checkpoint.
+
+    Writes one JSON record per job to `output_path` (default: next to the
+    input as <name>.results.jsonl). Jobs are held in memory only while in
+    flight: generation pulls at most 2x`concurrency` jobs ahead and form
+    filling at most `browser_workers`. The dedup index grows with the
+    applied jobs and the titled postings seen; bare URLs are checked
+    against it but not added.
+    """
+    output_path = output_path or os.path.splitext(input_path)[0] + ".results.jsonl"
+    checkpoint = BatchCheckpoint(output_path + ".checkpoint", input_path)
+    if checkpoint.watermark or checkpoint.done:
+        print(f"⏩ Resuming {input_path} after {checkpoint.watermark} completed records"
+              + (f", retrying {len(checkpoint.retry)} failed generations" if checkpoint.retry else ""))
+
+    from job_dedup import JobDeduplicator      # numpy; not needed for --help
+    resume_text = extract_resume_text(resume_path)
+    pipeline = new_pipeline(concurrency=concurrency, requests_per_minute=requests_per_minute,
+                            tokens_per_minute=tokens_per_minute)
+    dedup = JobDeduplicator(store=get_store())
+    if tailor:
+        os.makedirs("output", exist_ok=True)
+    counts = {"applied": 0, "failed": 0, "skipped": 0}
+    started = time.monotonic()
+    in_flight = {}
+
+    results = open(output_path, "a", encoding="utf-8")
+
+    def finish(index, job, status, retry=False, **fields):
+        # A retried job appends a new record; the last record for an index is its outcome.
+        record = {"index": index, "url": job and job["url"], "status": status, "time": time.time(), **fields}
+        results.write(json.dumps(record) + "\n")
+        results.flush()
+        checkpoint.mark(index, retry=retry)
+        counts[status] += 1
+        processed = sum(counts.values())
+        if processed % PROGRESS_EVERY == 0:
+            report_throughput(processed, started)
+
+    def pending():
+        for index, job in read_jobs(input_path):
+            if checkpoint.is_done(index):
+                continue
+            if job is None:
+                finish(index, None, "skipped", reason="no job URL in record")
+            elif dedup.is_duplicate(job):
+                finish(index, job, "skipped", reason="duplicate or already applied")
+            else:
+                yield index, job
+
+    def prepare(item):
+        _, job = item
+        cover_letter = generate_cover_letter(job["title"], job["company"], job["description"] or job["url"],
+                                             resume_text, first_name, last_name, pipeline=pipeline)
+        tailored = (tailor_resume(job["description"] or job["url"], resume_text, pipeline=pipeline)
+                    if tailor else None)
+        return cover_letter, tailored
+
+    def applications():
+        for (index, job), generated, error in pipeline.run(pending(), prepare):
+            portal = detect_portal(job["url"])
+            if error:
+                log_application(first_name, last_name, email, job["url"], portal, f"Error: {error}")
+                # Usually transient (rate limits, exhausted retries, no API key): retry on the next run.
+                finish(index, job, "failed", retry=True, portal=portal, stage="generate", error=str(error))
+                continue
+            cover_letter, tailored = generated
+            if tailored:
+                with open(f"output/tailored_resume_batch_{index}.txt", "w", encoding="utf-8") as f:
+                    f.write(tailored)
+            in_flight[index] = job
+            user_info = {"first_name": first_name, "last_name": last_name, "email": email,
+                         "cover_letter": cover_letter}
+            yield job["url"], resume_path, user_info, index
+
+    try:
+        for (job_url, _, _, index), result, error in route_applications(applications(), workers=browser_workers,
+                                                                        review=review):
+            job = in_flight.pop(index)
+            portal = detect_portal(job_url)
+            if error or not result.ok:
+                reason = str(error or result.error or f"invalid fields: {', '.join(result.validation_errors)}")
+                log_application(first_name, last_name, email, job_url, portal, f"Error: {reason}")
+                finish(index, job, "failed", portal=portal, stage="apply", error=reason,
+                       elapsed=result and round(result.elapsed, 3))
+            else:
+                log_application(first_name, last_name, email, job_url, portal, "Success")
+                dedup.mark_applied(job)
+                finish(index, job, "applied", portal=portal, backend=result.backend, elapsed=round(result.elapsed, 3),
+                       missing=result.missing)
+    except KeyboardInterrupt:
+        print("⏸️ Interrupted; progress is checkpointed, rerun the same command to resume.")
+    finally:
+        checkpoint.save()
+        results.close()
+        get_store().flush()
+        dedup.close()
+
+    report_throughput(sum(counts.values()), started)
+    print(f"🏁 Applied: {counts['applied']}, failed: {counts['failed']}, skipped: {counts['skipped']} "
+          f"(results in {output_path})")
+    if checkpoint.retry:
+        print(f"🔁 {len(checkpoint.retry)} jobs failed during generation; rerun the same command to retry them.")
+    return counts
+
+def report_throughput(processed, started):
+    minutes = max(time.monotonic() - started, 1e-9) / 60
+    print(f"⚡ {processed} jobs processed, {processed / minutes:.1f} jobs/min")
+
+# -------------------- Command Line Entry -------------------- #
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Apply to every job in a CSV/JSONL/URL-list file")
+    parser.add_argument("input", help="CSV or JSONL of jobs (url/title/company/description) or one URL per line")
+    parser.add_argument("--first", help="First name", required=True)
+    parser.add_argument("--last", help="Last name", required=True)
+    parser.add_argument("--email", help="Email address", required=True)
+    parser.add_argument("--resume", help="Path to resume PDF", required=True)
+    parser.add_argument("--output", help="Results JSONL (default: <input>.results.jsonl)", default=None)
+    parser.add_argument("--concurrency", help="Parallel OpenAI requests", type=int, default=4)
+    parser.add_argument("--rpm", help="OpenAI requests-per-minute limit", type=int, default=None)
+    parser.add_argument("--tpm", help="OpenAI tokens-per-minute limit", type=int, default=None)
+    parser.add_argument("--browsers", help="Parallel browser workers filling forms", type=int, default=None)
+    parser.add_argument("--review", help="Pause on each filled form for human review", action="store_true")
+    parser.add_argument("--tailor", help="Also write a tailored resume per job to output/", action="store_true")
+
+    args = parser.parse_args()
+
+    run_batch(
+        input_path=args.input,
+        resume_path=args.resume,
+        first_name=args.first,
+        last_name=args.last,
+        email=args.email,
+        output_path=args.output,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        browser_workers=args.browsers,
+        review=args.review,
+        tailor=args.tailor,
+    )
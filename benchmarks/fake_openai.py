@@ -0,0 +1,118 @@
+# benchmarks/fake_openai.py (local stand-in for the OpenAI chat completions API)
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import argparse
+import json
+import random
+import threading
+import time
+
+REPLY = ("Dear Hiring Manager, I am excited to apply for this role. My experience building data pipelines, "
+         "dashboards and analyses in Python and SQL matches what your team needs. I look forward to discussing "
+         "how I can help. Sincerely, Sarah Tadesse")
+PROMPT_FIXTURES_DIR = Path(__file__).with_name("fixtures") / "prompts"
+
+def load_prompt_fixtures(directory=PROMPT_FIXTURES_DIR):
+    """{name: fixture} for each recorded prompt/response pair (*.json) in `directory`."""
+    return {path.stem: json.loads(path.read_text(encoding="utf-8")) for path in sorted(Path(directory).glob("*.json"))}
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers POST /v1/chat/completions after `latency` seconds (plus optional 429s).
+
+    A prompt found in `replies` (e.g. from recorded prompt fixtures) gets its
+    recorded response; any other prompt gets REPLY. Streaming requests get
+    the reply one word per chunk, `token_delay` apart,
+    in the same server-sent-event format the openai client parses, ending
+    with a finish_reason chunk ("length" when `max_tokens` cut it short).
+    """
+    protocol_version = "HTTP/1.1"
+    latency = 0.2
+    token_delay = 0.0
+    error_rate = 0.0
+    replies = {}
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if random.random() < self.error_rate:
+            return self._json(429, {"error": {"message": "Rate limit reached (fake)", "type": "requests"}})
+        time.sleep(self.latency)
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        reply = self.replies.get(prompt, REPLY)
+        if body.get("stream"):
+            return self._stream(body, reply)
+        self._json(200, {
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "gpt-4"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(reply) // 4,
+                      "total_tokens": (len(prompt) + len(reply)) // 4},
+        })
+
+    def _json(self, status, payload):
+        out = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def _stream(self, body, reply):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        words = reply.split(" ")
+        limit = body.get("max_tokens")
+        finish_reason = "length" if limit and limit < len(words) else "stop"
+        words = words[:limit] if limit else words
+        for i, word in enumerate(words):
+            chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": body.get("model", "gpt-4"),
+                     "choices": [{"index": 0, "delta": {"content": word + (" " if i < len(words) - 1 else "")},
+                                  "finish_reason": None}]}
+            try:
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return          # the client cancelled the stream
+            time.sleep(self.token_delay)
+        final = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                 "model": body.get("model", "gpt-4"), "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]}
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+
+    def log_message(self, *args):
+        pass
+
+def start_fake_openai(port=0, latency=0.2, token_delay=0.0, error_rate=0.0, replies=None):
+    """Serve the fake API on a daemon thread; returns (server, api_base).
+
+    `replies` maps a prompt to the response to replay for it.
+    """
+    handler = type("Handler", (FakeOpenAIHandler,),
+                   {"latency": latency, "token_delay": token_delay, "error_rate": error_rate,
+                    "replies": dict(replies or {})})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1"
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat completions endpoint")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before each response starts")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--replay", nargs="?", const=str(PROMPT_FIXTURES_DIR), default=None,
+                        help="Answer recorded prompts with their recorded responses (default: the prompt fixtures)")
+    args = parser.parse_args()
+    replies = None
+    if args.replay:
+        replies = {f["prompt"]: f["response"] for f in load_prompt_fixtures(args.replay).values()}
+        print(f"📼 Replaying {len(replies)} recorded prompts from {args.replay}")
+    server, api_base = start_fake_openai(args.port, args.latency, args.token_delay, args.error_rate, replies)
+    print(f"🤖 Fake OpenAI listening; set OPENAI_API_BASE={api_base}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
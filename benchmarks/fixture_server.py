@@ -0,0 +1,82 @@
+# benchmarks/fixture_server.py (serves recorded portal pages and mock forms locally)
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+import hashlib
+import re
+import threading
+import time
+
+FIXTURES_DIR = Path(__file__).with_name("fixtures")
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# portal (as registered in job_scrapers.SCRAPERS) -> (URL prefix, fixture, page query parameter)
+PORTAL_FIXTURES = {
+    "Indeed": ("indeed", "indeed.html", "start"),
+    "SimplyHired": ("simplyhired", "simplyhired.html", "pn"),
+    "Monster": ("monster", "monster.html", "page"),
+}
+# Job links as they appear in the recorded pages.
+_JOB_LINK = re.compile(r'href="(?:https://www\.monster\.com)?(/viewjob\?[^"]*|/job/[^"]*|/job-openings/[^"]*)"')
+_EMPTY_PAGE = b"<!DOCTYPE html><html><body><p>No more results.</p></body></html>"
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """GET /<portal>/... returns that portal's recorded result page (first page only).
+
+    Job links are rewritten to /<portal>/felig_form.html?job=<n>, which serves
+    mock_form.html, so an end-to-end run can scrape, generate and fill
+    without leaving the machine. `latency` delays every response. Pages
+    carry an ETag and answer a matching If-None-Match with 304.
+    """
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        parts = urlsplit(self.path)
+        prefix, _, rest = parts.path.lstrip("/").partition("/")
+        name = Path(rest).name
+        if name == "felig_form.html":
+            return self._send(200, (REPO_DIR / "mock_form.html").read_bytes())
+        if name.startswith("mock_") and (REPO_DIR / name).exists():
+            return self._send(200, (REPO_DIR / name).read_bytes())
+        for portal, (portal_prefix, fixture, page_param) in PORTAL_FIXTURES.items():
+            if prefix == portal_prefix:
+                page = parse_qs(parts.query).get(page_param, ["0"])[0]
+                if page not in ("0", "1"):
+                    return self._send(200, _EMPTY_PAGE)
+                html = (FIXTURES_DIR / fixture).read_text(encoding="utf-8")
+                counter = iter(range(1_000_000))
+                html = _JOB_LINK.sub(lambda m: f'href="{self._base()}/{portal_prefix}/felig_form.html?job={next(counter)}"'
+                                     if portal == "Monster" else f'href="/felig_form.html?job={next(counter)}"', html)
+                return self._send(200, html.encode("utf-8"))
+        self._send(404, b"not found")
+
+    def _base(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _send(self, status, body):
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_fixture_server(port=0, latency=0.0):
+    """Serve fixtures on a daemon thread; returns (server, base_urls for the scrapers)."""
+    handler = type("Handler", (FixtureHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    return server, {portal: f"{base}/{prefix}" for portal, (prefix, _, _) in PORTAL_FIXTURES.items()}
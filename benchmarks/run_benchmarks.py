@@ -0,0 +1,365 @@
+# benchmarks/run_benchmarks.py (offline throughput and latency benchmarks)
+#
+# Run from the repository root:
+#   python -m benchmarks.run_benchmarks                  # all benchmarks
+#   python -m benchmarks.run_benchmarks --only parse fill
+#   python -m benchmarks.run_benchmarks --only startup   # import / --help latency
+#   python -m benchmarks.run_benchmarks --only prompts   # replay recorded prompt fixtures
+#   python -m benchmarks.run_benchmarks --only prompts --update-prompts   # re-record after a template change
+#   python -m benchmarks.run_benchmarks --only fill --require-browser   # fail instead of skipping Chrome
+#   CHROME_BINARY=... CHROMEDRIVER_PATH=... python -m benchmarks.run_benchmarks --only fill
+#   python -m benchmarks.run_benchmarks --json out.json --baseline last.json
+#
+# Everything runs against local fixtures: recorded portal result pages, the
+# mock application forms next to mock_form.html, recorded prompt/response
+# pairs and a fake OpenAI endpoint.
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.fake_openai import PROMPT_FIXTURES_DIR, load_prompt_fixtures, start_fake_openai
+from benchmarks.fixture_server import FIXTURES_DIR, PORTAL_FIXTURES, REPO_DIR, start_fixture_server
+
+MOCK_FORMS = {
+    "felig": "mock_form.html",
+    "workable": "mock_workable_form.html",
+    "greenhouse": "mock_greenhouse_form.html",
+    "lever": "mock_lever_form.html",
+}
+SAMPLE_USER = {
+    "first_name": "Sarah",
+    "last_name": "Tadesse",
+    "email": "sarah.tadesse@example.com",
+    "cover_letter": "This is a benchmark cover letter.",
+}
+RESUME_PATH = REPO_DIR / "data" / "user_resume.pdf"
+STARTUP_COMMANDS = {
+    "startup.import_agent": ["-c", "import job_search_ai_agent"],
+    "startup.agent_help": ["job_search_ai_agent.py", "--help"],
+    "startup.batch_help": ["batch_apply.py", "--help"],
+}
+STARTUP_REPEAT = 10
+
+def latency_stats(samples):
+    """p50/p95/max in milliseconds for a list of durations in seconds."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {"p50_ms": statistics.median(ordered) * 1000, "p95_ms": p95 * 1000, "max_ms": ordered[-1] * 1000}
+
+# -------------------- Scraper Parsing -------------------- #
+def bench_parse(repeat):
+    from job_scrapers import SCRAPERS
+    results = {}
+    for portal, (_, fixture, _) in PORTAL_FIXTURES.items():
+        html = (FIXTURES_DIR / fixture).read_text(encoding="utf-8")
+        plugin = SCRAPERS[portal]
+        samples, jobs = [], 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            jobs = len(plugin.parse_page(html, plugin.base_url))
+            samples.append(time.perf_counter() - started)
+        total = sum(samples)
+        results[f"parse.{portal}"] = {
+            "pages_per_s": repeat / total, "jobs_per_s": repeat * jobs / total,
+            "jobs_per_page": jobs, **latency_stats(samples),
+        }
+
+    import html_parsing
+    if html_parsing.PARSE_PROCESSES > 0:
+        pages = [((FIXTURES_DIR / fixture).read_text(encoding="utf-8"), SCRAPERS[portal])
+                 for portal, (_, fixture, _) in PORTAL_FIXTURES.items()] * repeat
+        for portal in PORTAL_FIXTURES:      # warm the pool's workers before timing
+            html_parsing.parse_pages(SCRAPERS[portal].parse_page, [(pages[0][0], SCRAPERS[portal].base_url)])
+        started = time.perf_counter()
+        for portal in PORTAL_FIXTURES:
+            plugin = SCRAPERS[portal]
+            html_parsing.parse_pages(plugin.parse_page, [(html, plugin.base_url) for html, p in pages if p is plugin])
+        elapsed = time.perf_counter() - started
+        results["parse.pool"] = {"pages_per_s": len(pages) / elapsed, "processes": html_parsing.PARSE_PROCESSES}
+    return results
+
+# -------------------- Form Filling -------------------- #
+def _browser_available():
+    from driver_pool import get_driver_pool
+    try:
+        with get_driver_pool().lease(timeout=60):
+            return True
+    except Exception as e:
+        print(f"⚠️ Browser benchmarks skipped (no usable Chrome/driver: {e.__class__.__name__})")
+        return False
+
+def verify_browser_fill(portal):
+    """Fill a mock form in Chrome, then read every field back through WebDriver.
+
+    This checks the DOM independently of the fill engine's own in-page
+    check: each text field must hold the rendered spec value and each
+    upload must have a file selected. Returns a list of mismatches.
+    """
+    from selenium.webdriver.common.by import By
+    from driver_pool import get_driver_pool
+    from multi_portal_bot import detect_portal, portal_handler
+    from portal_specs import PORTAL_SPECS, field_value
+    url = (REPO_DIR / MOCK_FORMS[portal]).as_uri()
+    if detect_portal(url) != portal:
+        return [f"{MOCK_FORMS[portal]} is detected as {detect_portal(url)}, not {portal}"]
+    spec = PORTAL_SPECS[portal]
+    mismatches = []
+    with get_driver_pool().lease() as driver:
+        result = portal_handler(portal)(driver, url, str(RESUME_PATH), SAMPLE_USER)
+        if result.error:
+            mismatches.append(f"fill error: {result.error}")
+        for field in spec["fields"]:
+            elements = driver.find_elements(By.CSS_SELECTOR, field["selector"])
+            if not elements:
+                if not field.get("optional"):
+                    mismatches.append(f"{field['name']}: no element matches {field['selector']}")
+                continue
+            if "upload" in field:
+                if not driver.execute_script("return arguments[0].files.length;", elements[0]):
+                    mismatches.append(f"{field['name']}: no file selected")
+                continue
+            expected = field_value(field, SAMPLE_USER).replace("\r\n", "\n").strip()
+            actual = (elements[0].get_property("value") or "").replace("\r\n", "\n").strip()
+            if actual != expected:
+                mismatches.append(f"{field['name']}: {actual!r} != {expected!r}")
+    return mismatches
+
+def bench_fill(repeat, require_browser=False):
+    from multi_portal_bot import route_application
+    resume_path = str(RESUME_PATH)
+    cases = [("felig", "http")]
+    if _browser_available():
+        cases += [(portal, "browser") for portal in MOCK_FORMS]
+    elif require_browser:
+        sys.exit("❌ --require-browser: Chrome/chromedriver could not be started")
+    results = {}
+    for portal, backend in cases:
+        url = (REPO_DIR / MOCK_FORMS[portal]).as_uri()
+        samples, failures = [], 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = route_application(url, resume_path, SAMPLE_USER, backend=backend)
+            samples.append(time.perf_counter() - started)
+            failures += not result.ok
+        results[f"fill.{portal}.{backend}"] = {
+            "fills_per_s": repeat / sum(samples), "failures": failures, **latency_stats(samples),
+        }
+        if backend == "browser":
+            mismatches = verify_browser_fill(portal)
+            results[f"fill.{portal}.{backend}"]["dom_mismatches"] = len(mismatches)
+            for line in mismatches:
+                print(f"❌ {portal}: {line}")
+    return results
+
+# -------------------- Prompt Fixtures -------------------- #
+def _fixture_prompts(fixture):
+    """(uncompacted prompt, compacted prompt) for a recorded fixture, built by the agent's own code."""
+    import job_search_ai_agent as agent
+    inputs = dict(fixture["inputs"])
+    inputs["resume_text"] = (PROMPT_FIXTURES_DIR / inputs.pop("resume")).read_text(encoding="utf-8")
+    if fixture["kind"] == "cover_letter":
+        args = [inputs[key] for key in ("job_title", "company", "job_description", "resume_text", "first_name", "last_name")]
+        return agent._cover_letter_prompt(*args), agent._cover_letter_prompt(*agent._cover_letter_inputs(*args))
+    args = [inputs["job_description"], inputs["resume_text"]]
+    return agent._tailor_resume_prompt(*args), agent._tailor_resume_prompt(*agent._tailor_resume_inputs(*args))
+
+def _generate_fixture(fixture, pipeline):
+    import job_search_ai_agent as agent
+    inputs = dict(fixture["inputs"])
+    resume_text = (PROMPT_FIXTURES_DIR / inputs.pop("resume")).read_text(encoding="utf-8")
+    if fixture["kind"] == "cover_letter":
+        return agent.generate_cover_letter(inputs["job_title"], inputs["company"], inputs["job_description"],
+                                           resume_text, inputs["first_name"], inputs["last_name"], pipeline=pipeline)
+    return agent.tailor_resume(inputs["job_description"], resume_text, pipeline=pipeline)
+
+def bench_prompts(update=False):
+    """Rebuild each recorded prompt and replay its recorded response through the agent.
+
+    A prompt that no longer matches its recording (prompt_drift) or a
+    generation that does not return the recorded response
+    (replay_mismatches) fails the run. Exact comparisons need the tokenizer
+    the fixture was recorded with; `update` re-records the prompts.
+    """
+    from prompt_builder import count_tokens, tokenizer_name
+    from llm_pipeline import new_pipeline
+    from settings import reset_settings
+    fixtures = load_prompt_fixtures()
+    tokenizer = tokenizer_name()
+    results = {}
+    for name, fixture in fixtures.items():
+        raw, prompt = _fixture_prompts(fixture)
+        if update:
+            fixture.update(prompt=prompt, tokenizer=tokenizer)
+            path = PROMPT_FIXTURES_DIR / f"{name}.json"
+            path.write_text(json.dumps(fixture, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        raw_tokens, prompt_tokens = count_tokens(raw), count_tokens(prompt)
+        results[f"prompts.{name}"] = {"raw_tokens": raw_tokens, "prompt_tokens": prompt_tokens,
+                                      "saved_pct": 100.0 * (raw_tokens - prompt_tokens) / raw_tokens}
+        if fixture["tokenizer"] == tokenizer:
+            results[f"prompts.{name}"]["prompt_drift"] = int(prompt != fixture["prompt"])
+        else:
+            print(f"⚠️ {name}: recorded with {fixture['tokenizer']}, counting with {tokenizer}; exact checks skipped")
+
+    llm, api_base = start_fake_openai(latency=0, replies={f["prompt"]: f["response"] for f in fixtures.values()})
+    workdir = tempfile.mkdtemp(prefix="prompt-fixtures-")
+    previous_cwd, previous_env = os.getcwd(), dict(os.environ)
+    os.chdir(workdir)                   # fresh LLM cache, so every fixture reaches the fake API
+    os.environ.update(OPENAI_API_BASE=api_base, OPENAI_API_KEY="benchmark")
+    try:
+        reset_settings()
+        pipeline = new_pipeline()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, fixture in fixtures.items():
+                if "prompt_drift" in results[f"prompts.{name}"]:
+                    mismatch = _generate_fixture(fixture, pipeline) != fixture["response"]
+                    results[f"prompts.{name}"]["replay_mismatches"] = int(mismatch)
+    finally:
+        os.chdir(previous_cwd)
+        os.environ.clear()
+        os.environ.update(previous_env)
+        reset_settings()
+        llm.shutdown()
+    return results
+
+# -------------------- Startup -------------------- #
+def _slowest_imports(module, top=3):
+    """The heaviest top-level imports of `module` by cumulative -X importtime (ms)."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    imports, children = [], []
+    for line in completed.stderr.splitlines()[1:]:          # skip the column header
+        _, cumulative, name = line.split("|")
+        depth = len(name) - len(name.lstrip())
+        if depth == 3:                                       # children are listed before their parent
+            children.append((int(cumulative) / 1000, name.strip()))
+        elif depth == 1:
+            if name.strip() == module:
+                imports = children
+            children = []
+    return ", ".join(f"{name} {ms:.0f}ms" for ms, name in sorted(imports, reverse=True)[:top])
+
+def bench_startup(repeat):
+    """Wall time of a fresh interpreter importing or running each entry point."""
+    results = {}
+    for name, argv in STARTUP_COMMANDS.items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, *argv], cwd=REPO_DIR, capture_output=True, check=True)
+            samples.append(time.perf_counter() - started)
+        results[name] = {"starts_per_s": repeat / sum(samples), **latency_stats(samples)}
+    results["startup.import_agent"]["slowest"] = _slowest_imports("job_search_ai_agent")
+    return results
+
+# -------------------- End-to-End Agent -------------------- #
+def bench_agent(jobs, llm_latency, concurrency):
+    """One cold run_job_search_agent over the fixture portals, in a scratch directory."""
+    fixtures, base_urls = start_fixture_server()
+    llm, api_base = start_fake_openai(latency=llm_latency)
+    workdir = tempfile.mkdtemp(prefix="job-agent-bench-")
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)                   # fresh LLM cache, resume cache, dedup index and store
+    os.environ["OPENAI_API_BASE"] = api_base
+    os.makedirs(".streamlit", exist_ok=True)
+    with open(os.path.join(".streamlit", "secrets.toml"), "w", encoding="utf-8") as f:
+        f.write('[openai]\napi_key = "benchmark"\n')
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import job_search_ai_agent
+            from application_store import get_store
+            from instrumentation import tracer
+            from settings import reset_settings
+            reset_settings()            # resolve the key and API base from the scratch dir and env above
+            tracer.reset()
+            started = time.perf_counter()
+            job_search_ai_agent.run_job_search_agent(
+                "Sarah", "Tadesse", "sarah.tadesse@example.com", str(RESUME_PATH), "data analyst", "remote",
+                limit=jobs, candidates=45, concurrency=concurrency, base_urls=base_urls,
+            )
+            elapsed = time.perf_counter() - started
+            applied = get_store().count()
+        stages = {row["name"]: row for row in tracer.summary()}
+    finally:
+        os.chdir(previous_cwd)
+        fixtures.shutdown()
+        llm.shutdown()
+
+    results = {"agent.end_to_end": {"jobs_per_min": applied / elapsed * 60, "wall_s": elapsed, "applications": applied}}
+    for name in ("scrape.fetch", "scrape.parse", "openai.complete", "portal.fill", "agent.rank"):
+        if name in stages:
+            row = stages[name]
+            key = name if name.startswith("agent.") else f"agent.{name}"
+            results[key] = {"count": row["count"], "mean_ms": row["mean"] * 1000, "max_ms": row["max"] * 1000}
+    return results
+
+# -------------------- Reporting -------------------- #
+def print_table(results):
+    for name, metrics in results.items():
+        cells = ", ".join(f"{key}={value:.1f}" if isinstance(value, float) else f"{key}={value}"
+                          for key, value in metrics.items())
+        print(f"{name:<32} {cells}")
+
+def regressions(results, baseline, tolerance):
+    """Throughput metrics that fell more than `tolerance` below the baseline."""
+    found = []
+    for name, metrics in results.items():
+        for key, value in metrics.items():
+            if "_per_" not in key:
+                continue
+            before = baseline.get(name, {}).get(key)
+            if before and value < before * (1 - tolerance):
+                found.append(f"{name}.{key}: {value:.1f} vs baseline {before:.1f}")
+    return found
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Offline benchmarks for scraping, generation and form filling")
+    parser.add_argument("--only", nargs="+", choices=["parse", "fill", "prompts", "agent", "startup"],
+                        default=["parse", "fill", "prompts", "agent", "startup"])
+    parser.add_argument("--repeat", type=int, default=50, help="Iterations for the parse and fill benchmarks")
+    parser.add_argument("--jobs", type=int, default=10, help="Jobs the end-to-end agent run applies to")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fake OpenAI response latency (seconds)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel OpenAI requests in the agent run")
+    parser.add_argument("--json", help="Write results to this JSON file", default=None)
+    parser.add_argument("--baseline", help="Compare throughput against a previous --json file", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop vs the baseline")
+    parser.add_argument("--require-browser", action="store_true",
+                        help="Fail instead of skipping the browser fill benchmarks when Chrome is unavailable")
+    parser.add_argument("--update-prompts", action="store_true",
+                        help="Re-record the prompt fixtures from the current prompt code (keeps their responses)")
+    args = parser.parse_args()
+
+    results = {}
+    if "parse" in args.only:
+        results.update(bench_parse(args.repeat))
+    if "fill" in args.only:
+        results.update(bench_fill(args.repeat, require_browser=args.require_browser))
+    if "prompts" in args.only:
+        results.update(bench_prompts(update=args.update_prompts))
+    if "agent" in args.only:
+        results.update(bench_agent(args.jobs, args.llm_latency, args.concurrency))
+    if "startup" in args.only:
+        results.update(bench_startup(min(args.repeat, STARTUP_REPEAT)))
+
+    print_table(results)
+    broken = [name for name, metrics in results.items()
+              if metrics.get("dom_mismatches") or metrics.get("failures")
+              or metrics.get("prompt_drift") or metrics.get("replay_mismatches")]
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.baseline:
+        found = regressions(results, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for line in found:
+            print(f"📉 Regression: {line}")
+        sys.exit(1 if found or broken else 0)
+    if broken:
+        print(f"❌ Broken fills or prompt fixtures: {', '.join(broken)}")
+        sys.exit(1)
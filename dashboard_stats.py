@@ -0,0 +1,68 @@
+# dashboard_stats.py (incrementally maintained dashboard aggregates)
+from collections import Counter
+import os
+import threading
+
+class DashboardAggregates:
+    """Running totals over the application store, updated from a row-id watermark.
+
+    `refresh` first compares the database files' size/mtime with the last
+    refresh and returns immediately when nothing was written. Otherwise it
+    folds in only rows above the watermark with one grouped query. If the
+    store was replaced or truncated, the aggregates are rebuilt from scratch.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._file_state = None
+        self._reset()
+
+    def _reset(self):
+        self.last_id = 0
+        self.total = 0
+        self.successful = 0
+        self.by_portal = Counter()
+        self.by_day = Counter()           # (day, success) -> count
+
+    def _current_file_state(self):
+        state = []
+        for path in (self.store.path, self.store.path + "-wal"):
+            try:
+                stat = os.stat(path)
+                state.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                state.append(None)
+        return tuple(state)
+
+    def refresh(self):
+        with self._lock:
+            file_state = self._current_file_state()
+            if file_state == self._file_state:
+                return self
+            max_id = self.store.query("SELECT COALESCE(MAX(id), 0) FROM applications")[0][0]
+            if max_id < self.last_id or (self._file_state and file_state[0] and self._file_state[0]
+                                          and file_state[0][0] != self._file_state[0][0]):
+                self._reset()
+            rows = self.store.query(
+                "SELECT portal, success, substr(timestamp, 1, 10), COUNT(*) FROM applications "
+                "WHERE id > ? AND id <= ? GROUP BY 1, 2, 3",
+                (self.last_id, max_id),
+            )
+            for portal, success, day, count in rows:
+                self.total += count
+                self.successful += count if success else 0
+                self.by_portal[portal] += count
+                self.by_day[(day, bool(success))] += count
+            self.last_id = max_id
+            self._file_state = file_state
+        return self
+
+    @property
+    def failed(self):
+        return self.total - self.successful
+
+    def daily_series(self):
+        """[(day, successful, failed)] sorted by day."""
+        days = sorted({day for day, _ in self.by_day})
+        return [(day, self.by_day[(day, True)], self.by_day[(day, False)]) for day in days]
@@ -0,0 +1,161 @@
+# driver_pool.py (bounded pool of warm Selenium Chrome drivers)
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+from contextlib import contextmanager
+from instrumentation import count, span
+import atexit
+import os
+import queue
+import threading
+import time
+
+# -------------------- CONFIG -------------------- #
+DEFAULT_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+HEADLESS = os.getenv("DRIVER_HEADLESS", "1") != "0"
+MAX_USES_PER_DRIVER = 25              # recycle long-lived browsers before they leak memory
+CHROME_BINARY = os.getenv("CHROME_BINARY")          # default: let Selenium find Chrome
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")  # default: chromedriver on PATH / Selenium Manager
+
+def make_chrome_driver(headless=HEADLESS):
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if CHROME_BINARY:
+        options.binary_location = CHROME_BINARY
+    service = Service(CHROMEDRIVER_PATH) if CHROMEDRIVER_PATH else None
+    return webdriver.Chrome(options=options, service=service)
+
+# -------------------- Driver Pool -------------------- #
+class DriverPool:
+    """Hands out at most `size` warm drivers, one application at a time each.
+
+    Drivers are started lazily, health-checked on checkout and reset on
+    return (cookies, storage, a fresh tab). Crashed drivers and drivers that
+    reached `max_uses` are quit and replaced.
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, driver_factory=make_chrome_driver, max_uses=MAX_USES_PER_DRIVER):
+        self.size = size
+        self.driver_factory = driver_factory
+        self.max_uses = max_uses
+        self._idle = queue.LifoQueue()    # most recently used first: warmest caches
+        self._uses = {}
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._start_driver_if_room()
+                if driver is None:
+                    # Poll so a slot freed by a discarded driver is noticed too.
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise TimeoutError(f"No browser driver became available within {timeout}s")
+                    try:
+                        driver = self._idle.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+            if self.is_healthy(driver):
+                return driver
+            print("♻️ Recycling unhealthy browser driver.")
+            count("driver.recycled")
+            self._discard(driver)
+
+    def release(self, driver, broken=False):
+        if self._closed:
+            self._discard(driver)
+            return
+        self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+        if broken or self._uses[id(driver)] >= self.max_uses or not self.reset(driver):
+            self._discard(driver)
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        with span("driver.acquire"):
+            driver = self.acquire(timeout=timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def reset(self, driver):
+        """Wipe per-application state. Returns False if the driver is unusable."""
+        try:
+            try:
+                driver.execute_script("window.localStorage && localStorage.clear(); window.sessionStorage && sessionStorage.clear();")
+            except WebDriverException:
+                pass  # about:blank and file:// pages have no storage
+            driver.delete_all_cookies()
+            if hasattr(driver, "execute_cdp_cmd"):
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            stale = driver.window_handles
+            driver.switch_to.new_window("tab")
+            fresh = driver.current_window_handle
+            for handle in stale:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(fresh)
+            return True
+        except WebDriverException:
+            return False
+
+    def is_healthy(self, driver):
+        try:
+            return bool(driver.window_handles) and driver.execute_script("return 1") == 1
+        except WebDriverException:
+            return False
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def _start_driver_if_room(self):
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        try:
+            with span("driver.start"):
+                return self.driver_factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _discard(self, driver):
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_driver_pool():
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = DriverPool()
+            atexit.register(_default_pool.close)
+    return _default_pool
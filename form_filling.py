@@ -0,0 +1,187 @@
+# form_filling.py (spec-driven form fill engine and completion checks)
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from dataclasses import dataclass, field
+from typing import Optional
+from portal_specs import field_value
+import os
+import time
+
+# -------------------- CONFIG -------------------- #
+PAGE_TIMEOUT = 10          # seconds to wait for the form to appear
+FIELD_TIMEOUT = 5          # seconds to wait for a value or upload to be committed
+REVIEW_TIMEOUT = 300       # seconds a human gets to review a filled form
+
+# -------------------- Fill Result -------------------- #
+@dataclass
+class FillResult:
+    portal: str
+    filled: list = field(default_factory=list)
+    missing: list = field(default_factory=list)
+    validation_errors: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    backend: str = "browser"
+    request: object = field(default=None, repr=False)     # prepared HTTP request (http backend)
+    response: object = field(default=None, repr=False)
+    started: float = field(default_factory=time.monotonic, repr=False)
+
+    @property
+    def ok(self):
+        return self.error is None and not self.validation_errors
+
+    def finish(self):
+        self.elapsed = time.monotonic() - self.started
+        return self
+
+    def summary(self):
+        parts = [f"{len(self.filled)} filled"]
+        if self.missing:
+            parts.append(f"missing: {', '.join(self.missing)}")
+        if self.validation_errors:
+            parts.append(f"invalid: {', '.join(self.validation_errors)}")
+        if self.error:
+            parts.append(f"error: {self.error}")
+        return f"{self.portal} ({self.backend}): " + "; ".join(parts) + f" ({self.elapsed:.2f}s)"
+
+# -------------------- Completion Conditions -------------------- #
+def upload_acknowledged(element):
+    return lambda driver: driver.execute_script("return arguments[0].files.length > 0;", element)
+
+def wait_for_form(driver, locator, timeout=PAGE_TIMEOUT):
+    return WebDriverWait(driver, timeout).until(EC.presence_of_element_located(locator))
+
+# -------------------- Generic Fill Engine -------------------- #
+# Sets every text field in one round trip. The native value setter plus
+# input/change events keeps framework-managed inputs (React, Vue) in sync,
+# and reading `value` back in the same script confirms the commit.
+_FILL_TEXT_FIELDS_JS = """
+const fields = arguments[0];
+const out = {filled: [], missing: [], uploads: []};
+for (const f of fields) {
+  const el = document.querySelector(f.selector);
+  if (!el) { out.missing.push(f.name); continue; }
+  if (f.upload) { out.uploads.push(el); continue; }
+  const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+              : el instanceof HTMLSelectElement ? HTMLSelectElement.prototype
+              : HTMLInputElement.prototype;
+  Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, f.value);
+  el.dispatchEvent(new Event('input', {bubbles: true}));
+  el.dispatchEvent(new Event('change', {bubbles: true}));
+  const want = f.value.replace(/\\r\\n/g, '\\n').trim();
+  (el.value.trim() === want ? out.filled : out.missing).push(f.name);
+}
+return out;
+"""
+
+# Confirms uploads and collects HTML5 validation messages in one round trip.
+_VERIFY_FORM_JS = """
+const uploads = arguments[0], form = document.querySelector(arguments[1]);
+const pending = uploads.map((el, i) => (el.files && el.files.length) ? -1 : i).filter(i => i >= 0);
+const errors = {};
+if (form) {
+  for (const el of form.elements) {
+    if (el.willValidate && !el.checkValidity()) errors[el.name || el.id] = el.validationMessage;
+  }
+}
+return {pending: pending, errors: errors};
+"""
+
+def fill_form(driver, url, spec, resume_path, user_info, portal=None, review=False,
+              page_timeout=PAGE_TIMEOUT, field_timeout=FIELD_TIMEOUT):
+    """Fill the form described by `spec` and return a FillResult (never submits).
+
+    Round trips: navigate, wait for `ready`, one script for all text fields,
+    one send_keys per upload, one script to verify uploads and validation.
+    """
+    result = FillResult(portal or spec.get("label", "unknown").lower())
+    label = spec.get("label", result.portal)
+    driver.get(url)
+
+    if spec.get("login_required"):
+        print(f"🔐 {label} support requires login and additional steps. Skipped for now.")
+        result.error = f"{label} requires login"
+        if review:
+            await_review(driver)
+        return result.finish()
+
+    try:
+        wait_for_form(driver, (By.CSS_SELECTOR, spec["ready"]), timeout=page_timeout)
+
+        text_fields, upload_fields = [], []
+        for field_spec in spec["fields"]:
+            if "upload" in field_spec:
+                upload_fields.append(field_spec)
+                text_fields.append({"name": field_spec["name"], "selector": field_spec["selector"], "upload": True})
+            else:
+                text_fields.append({"name": field_spec["name"], "selector": field_spec["selector"],
+                                    "value": field_value(field_spec, user_info)})
+        filled = driver.execute_script(_FILL_TEXT_FIELDS_JS, text_fields)
+        result.filled.extend(filled["filled"])
+        result.missing.extend(filled["missing"])
+
+        files = {"resume": resume_path}
+        upload_elements = []
+        for element, field_spec in zip(filled["uploads"], [f for f in upload_fields if f["name"] not in result.missing]):
+            element.send_keys(os.path.abspath(files[field_spec["upload"]]))
+            upload_elements.append((field_spec["name"], element))
+
+        verified = driver.execute_script(_VERIFY_FORM_JS, [el for _, el in upload_elements], spec.get("form", "form"))
+        for index, (name, element) in enumerate(upload_elements):
+            if index in verified["pending"]:
+                try:
+                    WebDriverWait(driver, field_timeout).until(upload_acknowledged(element))
+                except TimeoutException:
+                    result.missing.append(name)
+                    continue
+            result.filled.append(name)
+        result.validation_errors = verified["errors"]
+
+        optional = {f["name"] for f in spec["fields"] if f.get("optional")}
+        for name in result.missing:
+            if name in optional:
+                print(f"ℹ️ No {name.replace('_', ' ')} field present on {label}.")
+        required_missing = [name for name in result.missing if name not in optional]
+        if required_missing:
+            raise RuntimeError(f"Required fields not found: {', '.join(required_missing)}")
+
+        print(f"✅ {label} form filled (but not submitted)")
+        if review:
+            done = spec.get("done")
+            await_review(driver, form_locator=(By.CSS_SELECTOR, spec.get("form", "form")),
+                         done_locator=(By.CSS_SELECTOR, done) if done else None)
+        return result.finish()
+    except Exception as e:
+        print(f"❌ Error filling {label} form: {e}")
+        result.error = str(e)
+        return result.finish()
+
+def await_review(driver, timeout=REVIEW_TIMEOUT, form_locator=(By.TAG_NAME, "form"), done_locator=None):
+    """Hold the filled form open until a human submits it, leaves the page or closes the window.
+
+    Single-page forms that confirm in place can pass `done_locator`, an
+    element that becomes visible once the form has been submitted.
+    """
+    print(f"👀 Waiting up to {timeout}s for manual review (submit or close the tab to continue)...")
+    start_url = driver.current_url
+    try:
+        form = driver.find_element(*form_locator)
+    except NoSuchElementException:
+        form = None
+
+    def reviewed(d):
+        try:
+            if d.current_url != start_url:
+                return True
+            if done_locator and any(el.is_displayed() for el in d.find_elements(*done_locator)):
+                return True
+            return form is not None and EC.staleness_of(form)(d)
+        except WebDriverException:
+            return True  # window closed
+
+    try:
+        WebDriverWait(driver, timeout, ignored_exceptions=(WebDriverException,)).until(reviewed)
+    except TimeoutException:
+        print("⌛ Review window elapsed.")
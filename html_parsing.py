@@ -0,0 +1,98 @@
+# html_parsing.py (fast, partial parsing of job search result pages)
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+import multiprocessing
+import os
+import pickle
+import threading
+
+try:
+    import lxml  # noqa: F401  (only checked for; BeautifulSoup loads it by name)
+    PARSER = "lxml"
+except ImportError:          # optional: pure-Python fallback
+    PARSER = "html.parser"
+
+# -------------------- CONFIG -------------------- #
+# Worker processes for parsing result pages; 0 parses in the calling thread.
+PARSE_PROCESSES = int(os.getenv("PARSE_PROCESSES", str(min(4, os.cpu_count() or 1) if (os.cpu_count() or 1) > 1 else 0)))
+MIN_POOL_PAGE_BYTES = 20_000     # smaller pages are parsed inline; shipping them costs more than parsing
+
+# -------------------- Partial Parsing -------------------- #
+def card_soup(html, name, class_):
+    """Parse only the <name class=class_> job cards of a result page.
+
+    Everything outside the cards (scripts, navigation, footers) is skipped
+    by the tokenizer instead of being built into the tree.
+    """
+    return BeautifulSoup(html, PARSER, parse_only=SoupStrainer(name, class_=_has_class(class_)))
+
+def _has_class(class_):
+    # While parsing, the strainer sees the raw attribute ("tapItem result job_1"), not a list.
+    def match(value):
+        if not value:
+            return False
+        return class_ in (value.split() if isinstance(value, str) else value)
+    return match
+
+def cards(html, name, class_):
+    soup = card_soup(html, name, class_)
+    return soup.find_all(name, class_=class_)
+
+# -------------------- Process Pool -------------------- #
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver/spawn: forking a process that is running scraper threads is unsafe.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=PARSE_PROCESSES, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+@lru_cache(maxsize=None)
+def _picklable(parse):
+    # Checked once per function, so errors raised *by* a parser are never mistaken for this.
+    try:
+        pickle.dumps(parse)
+        return True
+    except (pickle.PicklingError, AttributeError, TypeError):
+        print(f"⚠️ {getattr(parse, '__qualname__', parse)} cannot be sent to the parser pool; parsing inline.")
+        return False
+
+def parse_page(parse, html, base_url):
+    """Run `parse(html, base_url)` in the parser pool, or inline for small pages.
+
+    `parse` must be a module-level function so it can be pickled; others
+    (e.g. a plugin registered with a lambda) are parsed inline. The calling
+    thread just waits on the result, so several scraper threads parse on
+    separate cores instead of taking turns on the GIL. If the pool is
+    disabled or breaks, the page is parsed in the calling thread. Errors
+    raised by `parse` itself propagate unchanged.
+    """
+    global _pool
+    if PARSE_PROCESSES <= 0 or len(html) < MIN_POOL_PAGE_BYTES or not _picklable(parse):
+        return parse(html, base_url)
+    try:
+        return _get_pool().submit(parse, html, base_url).result()
+    except BrokenProcessPool:
+        with _pool_lock:
+            _pool = None
+        return parse(html, base_url)
+
+def parse_pages(parse, pages):
+    """Parse many (html, base_url) pages across the pool; results keep input order."""
+    if PARSE_PROCESSES <= 0 or not _picklable(parse):
+        return [parse(html, base_url) for html, base_url in pages]
+    htmls, base_urls = zip(*pages) if pages else ((), ())
+    return list(_get_pool().map(parse, htmls, base_urls, chunksize=1))
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
@@ -0,0 +1,186 @@
+# http_cache.py (on-disk, conditional HTTP cache for scraper result pages)
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+import requests
+from instrumentation import count
+
+# -------------------- CONFIG -------------------- #
+HTTP_CACHE_FILE = "http_cache.sqlite3"
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE", "1") != "0"
+DEFAULT_TTL = 6 * 3600                 # seconds a page is served without asking the portal
+PORTAL_TTLS = {
+    "Indeed": 6 * 3600,
+    "SimplyHired": 12 * 3600,
+    "Monster": 12 * 3600,
+}
+MAX_AGE = 14 * 24 * 3600               # entries untouched this long are dropped
+COMPRESSION_LEVEL = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url_key TEXT PRIMARY KEY,
+    portal TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    body_hash TEXT NOT NULL,
+    encoding TEXT,
+    fetched REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS parsed (
+    body_hash TEXT NOT NULL,
+    parser TEXT NOT NULL,
+    jobs TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (body_hash, parser)
+);
+"""
+
+def cache_key(url):
+    """URL with case-insensitive parts lowercased, query sorted and fragment dropped.
+
+    Every query parameter is kept: on result pages `from`, `pos` or `start`
+    select different content.
+    """
+    parts = urlsplit((url or "").strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+@dataclass
+class CachedResponse:
+    url: str
+    text: str
+    body_hash: str
+    status: str                        # "fresh" (no request), "revalidated" (304) or "fetched"
+
+# -------------------- Cache -------------------- #
+class HTTPCache:
+    """Result pages stored zlib-compressed in SQLite, keyed by normalised URL.
+
+    Within the portal's TTL a page is served without any request. After
+    that it is revalidated with If-None-Match / If-Modified-Since, so an
+    unchanged page costs one empty 304. Parsed jobs are cached by body
+    hash, so an unchanged page is never parsed twice either.
+    """
+
+    def __init__(self, path=HTTP_CACHE_FILE, ttls=None, default_ttl=DEFAULT_TTL, max_age=MAX_AGE):
+        self.path = path
+        self.ttls = PORTAL_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._purge(time.time())
+
+    def fetch(self, url, session, timeout, portal=None):
+        url_key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body, body_hash, encoding, fetched FROM responses WHERE url_key = ?",
+                (url_key,),
+            ).fetchone()
+        ttl = self.ttls.get(portal, self.default_ttl)
+        if row and now - row[5] < ttl:
+            count("http_cache.fresh")
+            return CachedResponse(url, _decode(row[2], row[4]), row[3], "fresh")
+
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        response = session.get(url, timeout=timeout, headers=headers)
+        if response.status_code == 304 and row:
+            with self._lock:
+                self._conn.execute("UPDATE responses SET fetched = ? WHERE url_key = ?", (now, url_key))
+                self._conn.commit()
+            count("http_cache.revalidated")
+            return CachedResponse(url, _decode(row[2], row[4]), row[3], "revalidated")
+        if response.status_code == 304:
+            # Nothing stored to revalidate against (e.g. a caching proxy answered): ask for the page itself.
+            response = session.get(url, timeout=timeout, headers={"Cache-Control": "no-cache"})
+            if response.status_code == 304:
+                raise requests.HTTPError(f"304 Not Modified with no cached copy of {url}", response=response)
+
+        response.raise_for_status()
+        body = response.content
+        body_hash = hashlib.sha256(body).hexdigest()
+        encoding = response.encoding or "utf-8"
+        compressed = zlib.compress(body, COMPRESSION_LEVEL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url_key, portal, etag, last_modified, body, body_hash, encoding, fetched, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url_key, portal, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                 compressed, body_hash, encoding, now, len(compressed)),
+            )
+            self._conn.commit()
+        count("http_cache.fetched")
+        return CachedResponse(url, response.text, body_hash, "fetched")
+
+    def parsed(self, body_hash, parser):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT jobs FROM parsed WHERE body_hash = ? AND parser = ?", (body_hash, parser)
+            ).fetchone()
+        if row is None:
+            return None
+        count("parse_cache.hits")
+        return json.loads(row[0])
+
+    def store_parsed(self, body_hash, parser, jobs):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parsed (body_hash, parser, jobs, created) VALUES (?, ?, ?, ?)",
+                (body_hash, parser, json.dumps(jobs), time.time()),
+            )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            parsed = self._conn.execute("SELECT COUNT(*) FROM parsed").fetchone()[0]
+        return {"entries": entries, "bytes": size, "parsed": parsed}
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("DELETE FROM parsed")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _purge(self, now):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE fetched < ?", (now - self.max_age,))
+            self._conn.execute(
+                "DELETE FROM parsed WHERE body_hash NOT IN (SELECT body_hash FROM responses)"
+            )
+            self._conn.commit()
+
+def _decode(compressed, encoding):
+    return zlib.decompress(compressed).decode(encoding or "utf-8", errors="replace")
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_http_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HTTPCache()
+    return _default_cache
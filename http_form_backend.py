@@ -0,0 +1,105 @@
+# http_form_backend.py (browser-free application backend for plain HTML forms)
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin, urlparse
+from urllib.request import url2pathname
+import mimetypes
+import os
+import requests
+from form_filling import FillResult
+from job_scrapers import get_session, REQUEST_TIMEOUT
+from portal_specs import field_value
+
+_SKIPPED_INPUT_TYPES = {"file", "submit", "button", "image", "reset"}
+
+def fetch_form_html(url, session=None, timeout=REQUEST_TIMEOUT):
+    if url.startswith("file://"):
+        with open(url2pathname(urlparse(url).path), encoding="utf-8") as f:
+            return f.read()
+    session = session or get_session()
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+def _default_form_values(form):
+    # What a browser would send untouched: hidden inputs (CSRF tokens etc.),
+    # prefilled text, checked boxes and selected options.
+    data = {}
+    for element in form.select("input[name], textarea[name], select[name]"):
+        name = element["name"]
+        if element.name == "textarea":
+            data[name] = element.text
+        elif element.name == "select":
+            option = element.select_one("option[selected]") or element.select_one("option")
+            if option is not None:
+                data[name] = option.get("value", option.text)
+        else:
+            kind = element.get("type", "text").lower()
+            if kind in _SKIPPED_INPUT_TYPES:
+                continue
+            if kind in ("checkbox", "radio") and not element.has_attr("checked"):
+                continue
+            data[name] = element.get("value", "on" if kind in ("checkbox", "radio") else "")
+    return data
+
+def build_application_request(url, spec, resume_path, user_info, html=None, session=None, result=None):
+    """Parse the form at `url` and prepare the multipart request a browser would send."""
+    result = result or FillResult("http")
+    html = html if html is not None else fetch_form_html(url, session=session)
+    soup = BeautifulSoup(html, "html.parser")
+    form = soup.select_one(spec.get("form", "form"))
+    if form is None:
+        raise ValueError(f"No form matching {spec.get('form', 'form')!r} at {url}")
+
+    data = _default_form_values(form)
+    files = {}
+    uploads = {"resume": resume_path}
+    for field_spec in spec["fields"]:
+        element = form.select_one(field_spec["selector"])
+        if element is None or not element.get("name"):
+            result.missing.append(field_spec["name"])
+            continue
+        if "upload" in field_spec:
+            path = uploads[field_spec["upload"]]
+            with open(path, "rb") as f:
+                content = f.read()
+            mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            files[element["name"]] = (os.path.basename(path), content, mime)
+        else:
+            data[element["name"]] = field_value(field_spec, user_info)
+        result.filled.append(field_spec["name"])
+
+    action = urljoin(url, form.get("action") or url)
+    method = (form.get("method") or "post").upper()
+    if files:
+        method = "POST"  # multipart bodies are only sent with POST
+    request = requests.Request(method, action, data=data, files=files or None)
+    return (session or get_session()).prepare_request(request)
+
+def apply_via_http(url, spec, resume_path, user_info, portal=None, dry_run=True, session=None):
+    """Fill (and optionally send) a plain HTML application form without a browser.
+
+    With `dry_run` (the default) the prepared request is returned on the
+    FillResult without being sent, matching the browser path's no-submit rule.
+    """
+    result = FillResult(portal or spec.get("label", "unknown").lower(), backend="http")
+    label = spec.get("label", result.portal)
+    try:
+        result.request = build_application_request(url, spec, resume_path, user_info, session=session, result=result)
+        optional = {f["name"] for f in spec["fields"] if f.get("optional")}
+        required_missing = [name for name in result.missing if name not in optional]
+        if required_missing:
+            raise RuntimeError(f"Required fields not found: {', '.join(required_missing)}")
+
+        if dry_run:
+            print(f"✅ {label} form prepared over HTTP (dry run, not submitted)")
+        elif urlparse(result.request.url).scheme not in ("http", "https"):
+            raise RuntimeError(f"Cannot submit to non-HTTP action {result.request.url}")
+        else:
+            response = (session or get_session()).send(result.request, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            result.response = response
+            print(f"✅ {label} form submitted over HTTP ({response.status_code})")
+    except Exception as e:
+        print(f"❌ Error preparing {label} form over HTTP: {e}")
+        result.error = str(e)
+    return result.finish()
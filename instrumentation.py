@@ -0,0 +1,253 @@
+# instrumentation.py (in-process spans, counters and profiling for pipeline runs)
+from collections import deque
+from contextlib import contextmanager
+import contextvars
+import csv
+import functools
+import io
+import json
+import os
+import threading
+import time
+
+# -------------------- CONFIG -------------------- #
+MAX_SPANS = 100_000                # raw spans kept for the trace file; aggregates are unbounded
+ENABLED = os.getenv("INSTRUMENTATION", "1") != "0"
+
+class _Aggregate:
+    __slots__ = ("count", "total", "max", "errors")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+# -------------------- Tracer -------------------- #
+class Tracer:
+    """Collects timed spans and counters from any thread.
+
+    Every span updates a per-name aggregate (count, total, max, errors) for
+    the summary table, and the most recent MAX_SPANS spans are also kept
+    individually for the trace export. Spans nest per thread, so a trace
+    shows e.g. which portal fill a driver start belonged to. A tracer with a
+    `parent` (see `run_tracer`) also forwards everything to the parent.
+    """
+
+    def __init__(self, max_spans=MAX_SPANS, parent=None):
+        self.parent = parent
+        self.started = time.time()
+        self._origin = time.perf_counter()
+        self._spans = deque(maxlen=max_spans)
+        self._aggregates = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name, **attrs):
+        if not ENABLED:
+            yield attrs
+            return
+        stack = self._local.__dict__.setdefault("stack", [])
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield attrs              # callers may add attributes while the span is open
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            self._add({
+                "name": name,
+                "start": start - self._origin,
+                "duration": duration,
+                "thread": threading.current_thread().name,
+                "parent": parent,
+                "error": error,
+                **attrs,
+            })
+
+    def _add(self, record):
+        if self.parent is not None:
+            # The parent measures time from its own origin.
+            self.parent._add({**record, "start": record["start"] + self._origin - self.parent._origin})
+        with self._lock:
+            self._spans.append(record)
+            aggregate = self._aggregates.get(record["name"])
+            if aggregate is None:
+                aggregate = self._aggregates[record["name"]] = _Aggregate()
+            aggregate.count += 1
+            aggregate.total += record["duration"]
+            aggregate.max = max(aggregate.max, record["duration"])
+            aggregate.errors += record["error"] is not None
+
+    def count(self, name, n=1):
+        if not ENABLED:
+            return
+        if self.parent is not None:
+            self.parent.count(name, n)
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def timed(self, name=None):
+        """Decorator form of `span`."""
+        def decorate(fn):
+            label = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(label):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    # ---------- reporting ---------- #
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def summary(self):
+        """[{name, count, total, mean, max, errors}] sorted by total time."""
+        with self._lock:
+            rows = [
+                {"name": name, "count": a.count, "total": a.total, "mean": a.total / a.count,
+                 "max": a.max, "errors": a.errors}
+                for name, a in self._aggregates.items()
+            ]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def summary_table(self):
+        wall = time.perf_counter() - self._origin
+        lines = [f"{'stage':<28} {'count':>7} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'% wall':>7} {'errors':>6}"]
+        for row in self.summary():
+            lines.append(
+                f"{row['name']:<28} {row['count']:>7} {row['total']:>9.2f} {row['mean'] * 1000:>9.1f} "
+                f"{row['max'] * 1000:>9.1f} {100 * row['total'] / wall:>6.1f}% {row['errors']:>6}"
+            )
+        counters = self.counters()
+        if counters:
+            lines.append("")
+            lines.extend(f"{name:<28} {value:>7}" for name, value in sorted(counters.items()))
+        lines.append(f"(wall time {wall:.2f}s; stages overlap when run in parallel)")
+        return "\n".join(lines)
+
+    def export_json(self, path):
+        """Write spans in Chrome trace-event format (open in Perfetto or chrome://tracing)."""
+        threads = {}
+        events = []
+        for record in self.spans():
+            tid = threads.setdefault(record["thread"], len(threads) + 1)
+            args = {k: v for k, v in record.items() if k not in ("name", "start", "duration", "thread")}
+            events.append({"name": record["name"], "ph": "X", "pid": 1, "tid": tid,
+                           "ts": record["start"] * 1e6, "dur": record["duration"] * 1e6, "args": args})
+        events.extend({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                      for name, tid in threads.items())
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "otherData": {"started": self.started, "counters": self.counters()}},
+                      f, default=str)
+        return path
+
+    def export_csv(self, path):
+        records = self.spans()
+        columns = ["name", "start", "duration", "thread", "parent", "error"]
+        columns += sorted({key for record in records for key in record} - set(columns))
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(records)
+        return path
+
+    def export(self, path):
+        """Export to `path` as CSV if it ends in .csv, otherwise as a JSON trace."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return self.export_csv(path) if path.lower().endswith(".csv") else self.export_json(path)
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._aggregates.clear()
+            self._counters.clear()
+        self.started = time.time()
+        self._origin = time.perf_counter()
+
+# -------------------- Profiling -------------------- #
+@contextmanager
+def profile(path=None, top=25):
+    """cProfile the block; dump stats to `path` (if given) and print the top entries.
+
+    cProfile only sees the thread that entered the block, so worker-thread
+    hot spots show up as time waiting on futures; the span summary covers those.
+    """
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+            print(f"🔬 Profile written to {path} (view with `python -m pstats {path}` or snakeviz)")
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        print(out.getvalue())
+
+# -------------------- Default and Per-Run Tracers -------------------- #
+tracer = Tracer()                  # process-wide totals
+_current = contextvars.ContextVar("tracer", default=None)
+
+def current_tracer():
+    return _current.get() or tracer
+
+@contextmanager
+def run_tracer():
+    """Record the block's spans and counters in a fresh Tracer (also forwarded to `tracer`).
+
+    The run tracer is found through a context variable, so concurrent runs
+    in one process (e.g. background UI runs) each report only their own
+    work. Threads started inside the block must be given `bind_context(fn)`
+    to record into it.
+    """
+    run = Tracer(parent=tracer)
+    token = _current.set(run)
+    try:
+        yield run
+    finally:
+        _current.reset(token)
+
+def bind_context(fn):
+    """`fn` wrapped to run in a copy of the caller's context (and so its run tracer).
+
+    Wrap at each submit: one copied context cannot be entered by two threads at once.
+    """
+    return functools.partial(contextvars.copy_context().run, fn)
+
+def span(name, **attrs):
+    return current_tracer().span(name, **attrs)
+
+def count(name, n=1):
+    current_tracer().count(name, n)
+
+def timed(name=None):
+    """Decorator form of `span`, recording into whichever tracer is current at call time."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
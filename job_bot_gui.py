@@ -1,24 +1,37 @@
 # job_bot_gui.py
 import streamlit as st
 from multi_portal_bot import route_application, detect_portal
-import openai
+from llm_cache import get_cache, make_key
+from llm_pipeline import CompletionStream, get_pipeline
+from prompt_builder import compact_resume, record_prompt
+from resume_ingest import extract_resume_text
+from application_store import COLUMNS, get_store, log_application
+from dashboard_stats import DashboardAggregates
 import os
-import csv
-import pandas as pd
-from datetime import datetime
+import time
 
 # -------------------- CONFIG -------------------- #
-openai.api_key = os.getenv("OPENAI_API_KEY")
-LOG_FILE = "application_log.csv"
+DASHBOARD_PAGE_SIZE = 100
+MODEL = "gpt-4"
+COVER_LETTER_TEMPLATE_VERSION = "gui-cover-letter-v2"
+COVER_LETTER_MAX_TOKENS = 600
+STREAM_RENDER_INTERVAL = 0.1     # seconds between live text_area redraws
 
 st.set_page_config(page_title="Felig Job Application Bot", page_icon="🤖")
 st.title("🤖 Felig Job Application Assistant")
 
 menu = st.sidebar.selectbox("Choose View", ["Apply", "Dashboard"])
 
+# -------------------- Shared Browser Pool -------------------- #
+@st.cache_resource
+def shared_driver_pool():
+    # One warm pool per server process, shared by every session and rerun.
+    from driver_pool import get_driver_pool
+    return get_driver_pool()
+
 # -------------------- GPT Cover Letter Generation -------------------- #
-def generate_cover_letter(job_url, resume_text):
-    prompt = f"""
+def _cover_letter_prompt(job_url, resume_text):
+    return f"""
 You are an AI assistant helping someone apply for a job. Given the resume and job link, generate a professional and concise cover letter.
 
 Job URL:
@@ -33,60 +46,80 @@ Guidelines:
 - Be under 300 words
 - End with "Sincerely, Sarah Tadesse"
 """
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7
-        )
-        return response['choices'][0]['message']['content']
-    except Exception as e:
-        return f"[Error generating cover letter: {e}]"
-
-# -------------------- Application Logger -------------------- #
-def log_application(first_name, last_name, email, job_url, portal, status):
-    headers = ["First Name", "Last Name", "Email", "Job URL", "Portal", "Status", "Timestamp"]
-    row = [
-        first_name,
-        last_name,
-        email,
-        job_url,
-        portal,
-        status,
-        datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    ]
-    file_exists = os.path.isfile(LOG_FILE)
-    with open(LOG_FILE, mode="a", newline="") as file:
-        writer = csv.writer(file)
-        if not file_exists:
-            writer.writerow(headers)
-        writer.writerow(row)
+
+def stream_cover_letter(job_url, resume_text, max_tokens=COVER_LETTER_MAX_TOKENS):
+    # Cache hits come back whole; fresh completions stream and are cached only if the model finished them.
+    resume_text = compact_resume(resume_text, model=MODEL)
+    key = make_key(MODEL, COVER_LETTER_TEMPLATE_VERSION, resume_text, job_url)
+    cached = get_cache().get(key)
+    if cached is not None:
+        return CompletionStream.from_text(cached)
+    prompt = _cover_letter_prompt(job_url, resume_text)
+    record_prompt("cover_letter", prompt, model=MODEL)
+    return get_pipeline().stream(
+        prompt, model=MODEL, temperature=0.7, max_tokens=max_tokens,
+        on_complete=lambda text: get_cache().set(key, text, kind="cover_letter"),
+    )
+
+def render_cover_letter_stream(stream):
+    """Draw the letter into one text_area as it streams; returns the final text.
+
+    Pressing Stop reruns the script, which closes the stream mid-way; the
+    partial letter is then neither cached nor kept in the session.
+    """
+    placeholder = st.empty()
+    st.button("⏹️ Stop generating")
+    last_draw = 0.0
+    for i, _ in enumerate(stream):
+        now = time.monotonic()
+        if now - last_draw >= STREAM_RENDER_INTERVAL:
+            placeholder.text_area("📄 Suggested Cover Letter", value=stream.text, height=250,
+                                  key=f"cover_letter_stream_{i}")
+            last_draw = now
+    placeholder.text_area("📄 Suggested Cover Letter", value=stream.text, height=250)
+    if stream.time_to_first_token is not None:
+        note = " (token cap reached)" if stream.truncated else ""
+        st.caption(f"⏱️ First output after {stream.time_to_first_token:.2f}s, "
+                   f"complete after {stream.elapsed:.2f}s{note}")
+    return stream.text
 
 # -------------------- Dashboard -------------------- #
+@st.cache_resource
+def dashboard_aggregates():
+    # Shared by every session; each rerun only folds in rows logged since the last one.
+    return DashboardAggregates(get_store())
+
 def show_dashboard():
+    import pandas as pd      # only the dashboard view needs it; Apply reruns skip the import
     st.header("📊 Application Dashboard")
-    if not os.path.exists(LOG_FILE):
+    stats = dashboard_aggregates().refresh()
+    if not stats.total:
         st.warning("No applications have been logged yet.")
         return
 
-    df = pd.read_csv(LOG_FILE)
-    df["Timestamp"] = pd.to_datetime(df["Timestamp"])
-
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("Total Applications", len(df))
-        st.metric("Unique Portals", df["Portal"].nunique())
+        st.metric("Total Applications", stats.total)
+        st.metric("Unique Portals", len(stats.by_portal))
     with col2:
-        success_count = df["Status"].str.contains("Success").sum()
-        st.metric("Successful", success_count)
-        st.metric("Failed", len(df) - success_count)
+        st.metric("Successful", stats.successful)
+        st.metric("Failed", stats.failed)
 
     st.subheader("Applications by Portal")
-    portal_counts = df["Portal"].value_counts()
+    portal_counts = pd.DataFrame(stats.by_portal.most_common(), columns=["Portal", "Applications"]).set_index("Portal")
     st.bar_chart(portal_counts)
 
+    st.subheader("Applications per Day")
+    daily = pd.DataFrame(stats.daily_series(), columns=["Day", "Successful", "Failed"]).set_index("Day")
+    st.line_chart(daily)
+
     st.subheader("Detailed Log")
-    st.dataframe(df.sort_values("Timestamp", ascending=False), use_container_width=True)
+    if not st.checkbox("Show detailed log", value=False):
+        return
+    pages = max(1, -(-stats.total // DASHBOARD_PAGE_SIZE))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1)
+    rows = get_store().recent(limit=DASHBOARD_PAGE_SIZE, offset=(page - 1) * DASHBOARD_PAGE_SIZE)
+    st.dataframe(pd.DataFrame(rows, columns=COLUMNS), use_container_width=True)
 
 # -------------------- Streamlit Form -------------------- #
 def show_application_form():
@@ -109,17 +142,12 @@ def show_application_form():
 
     cover_letter = ""
     if generate and resume_file and job_url:
-        with st.spinner("Generating cover letter using GPT-4..."):
-            resume_path = os.path.join("temp", resume_file.name)
-            os.makedirs("temp", exist_ok=True)
-            with open(resume_path, "wb") as f:
-                f.write(resume_file.getbuffer())
-            with open(resume_path, "rb") as f:
-                resume_text = f.read().decode(errors="ignore")
-            cover_letter = generate_cover_letter(job_url, resume_text)
+        resume_text = extract_resume_text(resume_file.getvalue())
+        try:
+            cover_letter = render_cover_letter_stream(stream_cover_letter(job_url, resume_text))
             st.session_state["cover_letter"] = cover_letter
-            st.text_area("📄 Suggested Cover Letter", value=cover_letter, height=250)
-            os.remove(resume_path)
+        except Exception as e:
+            st.error(f"[Error generating cover letter: {e}]")
 
     if submitted:
         if not resume_file or not job_url:
@@ -140,9 +168,15 @@ def show_application_form():
 
                 portal = detect_portal(job_url)
                 try:
-                    route_application(job_url, resume_path, user_info)
-                    st.success("✅ Application simulated successfully (not submitted).")
-                    log_application(first_name, last_name, email, job_url, portal, "Success")
+                    result = route_application(job_url, resume_path, user_info, pool=shared_driver_pool())
+                    if result.ok:
+                        st.success(f"✅ Application simulated successfully (not submitted) in {result.elapsed:.1f}s.")
+                        log_application(first_name, last_name, email, job_url, portal, "Success")
+                    else:
+                        st.error(f"❌ Application incomplete: {result.summary()}")
+                        log_application(first_name, last_name, email, job_url, portal, f"Error: {result.summary()}")
+                    if result.missing:
+                        st.info(f"Fields not found on the form: {', '.join(result.missing)}")
                 except Exception as e:
                     st.error(f"❌ Error during application: {e}")
                     log_application(first_name, last_name, email, job_url, portal, f"Error: {e}")
@@ -0,0 +1,216 @@
+# job_dedup.py (cross-portal job deduplication and seen-jobs index)
+import hashlib
+import re
+import sqlite3
+import time
+import numpy as np
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# -------------------- CONFIG -------------------- #
+SEEN_JOBS_FILE = "seen_jobs.sqlite3"
+SIMHASH_MAX_DISTANCE = 10           # of 64 bits; unrelated text averages ~32
+TITLE_ABBREVIATIONS = {
+    "sr": "senior", "jr": "junior", "mgr": "manager", "eng": "engineer", "engr": "engineer",
+    "dev": "developer", "assoc": "associate", "asst": "assistant", "admin": "administrator",
+}
+COMPANY_SUFFIXES = {"inc", "llc", "ltd", "corp", "corporation", "co", "company", "plc", "gmbh", "the"}
+
+TRACKING_PARAMS = {
+    "from", "tk", "advn", "fccid", "vjs", "sjdu", "pos", "ref", "refid", "src", "source",
+    "trackingid", "gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "_ga", "xpse", "xfps", "xkcb",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS applied_jobs (
+    url_key TEXT PRIMARY KEY,
+    fingerprint TEXT,
+    simhash INTEGER,
+    description_simhash INTEGER,
+    title TEXT,
+    company TEXT,
+    applied_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# -------------------- Normalization -------------------- #
+def normalize_url(url):
+    """Canonical form of a job URL: no tracking params, fragment or host noise."""
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=False)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", host, path, urlencode(query), ""))
+
+_WORDS = re.compile(r"[a-z0-9]+")
+
+def _words(text):
+    return _WORDS.findall((text or "").lower())
+
+def fingerprint(job):
+    """Exact-duplicate key over normalised title, company and description."""
+    canonical = "|".join(" ".join(_words(job.get(key))) for key in ("title", "company", "description"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+# -------------------- SimHash -------------------- #
+_BIT_POSITIONS = np.arange(64, dtype=np.uint64)
+_UINT64 = (1 << 64) - 1
+
+def _feature_hashes(features):
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little") for f in features),
+        dtype=np.uint64,
+    )
+
+def _title_words(job):
+    return [TITLE_ABBREVIATIONS.get(w, w) for w in _words(job.get("title"))]
+
+def _simhash(weighted_words):
+    features = []
+    for words, weight in weighted_words:
+        features.extend(words * weight)
+        features.extend([f"{a} {b}" for a, b in zip(words, words[1:])] * weight)
+    if not features:
+        return 0
+    hashes = _feature_hashes(features)
+    bits = ((hashes[:, None] >> _BIT_POSITIONS) & np.uint64(1)).astype(np.int64)
+    votes = (2 * bits - 1).sum(axis=0)
+    return int(np.packbits((votes > 0)[::-1].astype(np.uint8)).view(">u8")[0])
+
+def simhash(job):
+    # Title words dominate: the same posting carries different snippets on each portal.
+    return _simhash(((_title_words(job), 3), (_words(job.get("description")), 1)))
+
+def description_simhash(job):
+    return _simhash(((_words(job.get("description")), 1),))
+
+def _to_signed(sh):
+    # SQLite integers are signed 64-bit; store hashes in two's complement.
+    return sh - (1 << 64) if sh >= (1 << 63) else sh
+
+def _to_unsigned(sh):
+    return sh & _UINT64 if sh is not None else None
+
+def company_key(job):
+    words = [w for w in _words(job.get("company")) if w not in COMPANY_SUFFIXES]
+    return " ".join(words)
+
+def title_key(job):
+    return " ".join(_title_words(job))
+
+def _hamming(a, b):
+    return bin(a ^ b).count("1")
+
+# -------------------- Deduplicator -------------------- #
+class JobDeduplicator:
+    """Drops duplicate postings as they stream in and remembers applied jobs.
+
+    Exact URL and fingerprint checks are set lookups and near-duplicate
+    checks only scan the same company's postings, so each job costs O(1)
+    amortised. Applied jobs persist in SQLite and are seeded from the
+    application store, so daily runs only process new postings.
+    """
+
+    def __init__(self, path=SEEN_JOBS_FILE, store=None):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._urls = set()
+        self._fingerprints = set()
+        self._by_company = {}     # company key -> [(title key, simhash, description simhash)]
+        self.skipped = 0
+        rows = self._conn.execute(
+            "SELECT url_key, fingerprint, simhash, description_simhash, title, company FROM applied_jobs"
+        )
+        for url_key, fp, sh, desc_sh, title, company in rows:
+            job = {"title": title, "company": company}
+            self._remember(url_key, fp, _to_unsigned(sh), _to_unsigned(desc_sh), job if company else None)
+        if store is not None:
+            self.import_applications(store)
+
+    def _remember(self, url_key, fp=None, sh=None, desc_sh=None, job=None):
+        self._urls.add(url_key)
+        if fp:
+            self._fingerprints.add(fp)
+        if job is not None:
+            self._by_company.setdefault(company_key(job), []).append((title_key(job), sh, desc_sh))
+
+    def _near_duplicate(self, job, sh, desc_sh):
+        # Only postings from the same company are compared, so each check
+        # touches a handful of entries rather than the whole index. The same
+        # title is not enough on its own (one company posts "Data Analyst" in
+        # several cities); the descriptions must be near-identical too.
+        title = title_key(job)
+        for other_title, other_sh, other_desc_sh in self._by_company.get(company_key(job), ()):
+            if title == other_title:
+                if _hamming(desc_sh, other_desc_sh) <= SIMHASH_MAX_DISTANCE:
+                    return True
+            elif sh and other_sh and _hamming(sh, other_sh) <= SIMHASH_MAX_DISTANCE:
+                return True
+        return False
+
+    def is_duplicate(self, job):
+        url_key = normalize_url(job.get('url'))
+        if url_key in self._urls:
+            return True
+        if not job.get('title'):
+            # A bare URL (e.g. from a batch file) has no content to compare and is
+            # not remembered, so a huge URL list does not grow the index; repeats
+            # are caught once the first one is applied (mark_applied).
+            return False
+        fp = fingerprint(job)
+        if fp in self._fingerprints:
+            return True
+        sh, desc_sh = simhash(job), description_simhash(job)
+        if self._near_duplicate(job, sh, desc_sh):
+            return True
+        self._remember(url_key, fp, sh, desc_sh, job)
+        return False
+
+    def filter(self, jobs):
+        """Yield only jobs not already seen in this run or applied to before."""
+        for job in jobs:
+            if self.is_duplicate(job):
+                self.skipped += 1
+                continue
+            yield job
+
+    def mark_applied(self, job):
+        url_key = normalize_url(job.get('url'))
+        fp, sh, desc_sh = fingerprint(job), simhash(job), description_simhash(job)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO applied_jobs "
+            "(url_key, fingerprint, simhash, description_simhash, title, company, applied_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url_key, fp, _to_signed(sh), _to_signed(desc_sh), job.get('title'), job.get('company'), time.time()),
+        )
+        self._conn.commit()
+        self._remember(url_key, fp, sh, desc_sh, job)
+
+    def import_applications(self, store):
+        """Index successful applications logged since the last import."""
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'last_application_id'").fetchone()
+        last_id = int(row[0]) if row else 0
+        imported = 0
+        for last_id, job_url in store.successful_urls(after_id=last_id):
+            url_key = normalize_url(job_url)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO applied_jobs (url_key, applied_at) VALUES (?, ?)", (url_key, time.time())
+            )
+            self._remember(url_key)
+            imported += 1
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES ('last_application_id', ?)", (str(last_id),)
+        )
+        self._conn.commit()
+        return imported
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,86 @@
+# job_ranking.py (offline BM25 relevance ranking of scraped jobs)
+import re
+
+# -------------------- CONFIG -------------------- #
+BM25_K1 = 1.5
+BM25_B = 0.75
+TITLE_WEIGHT = 3            # title terms count this many times towards a job's term frequency
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the their this to was we
+were will with you your they them he she his her i me my not but if so than then there which who
+""".split())
+
+def tokenize(text):
+    return [token for token in _TOKEN.findall((text or "").lower()) if token not in STOPWORDS and len(token) > 1]
+
+def job_text(job):
+    return " ".join([(job.get('title') or '') + " "] * TITLE_WEIGHT + [job.get('company') or '', job.get('description') or ''])
+
+# -------------------- BM25 Index -------------------- #
+class JobIndex:
+    """BM25 index over a batch of jobs, built once and queried many times.
+
+    Postings are stored as flat NumPy arrays (term id, doc id, precomputed
+    BM25 weight), so scoring a query is a boolean gather plus one bincount
+    over the postings — no Python loop per job.
+    """
+
+    def __init__(self, jobs, k1=BM25_K1, b=BM25_B):
+        import numpy as np       # deferred: tokenize() is imported by modules that never rank
+        self.jobs = list(jobs)
+        self.vocabulary = {}
+        term_ids, doc_ids, freqs = [], [], []
+        doc_lengths = np.zeros(len(self.jobs), dtype=np.float64)
+
+        for doc_id, job in enumerate(self.jobs):
+            counts = {}
+            for token in tokenize(job_text(job)):
+                term = self.vocabulary.setdefault(token, len(self.vocabulary))
+                counts[term] = counts.get(term, 0) + 1
+            doc_lengths[doc_id] = sum(counts.values())
+            term_ids.extend(counts.keys())
+            doc_ids.extend([doc_id] * len(counts))
+            freqs.extend(counts.values())
+
+        self._terms = np.asarray(term_ids, dtype=np.int64)
+        self._docs = np.asarray(doc_ids, dtype=np.int64)
+        tf = np.asarray(freqs, dtype=np.float64)
+
+        n_docs = max(len(self.jobs), 1)
+        doc_freq = np.bincount(self._terms, minlength=len(self.vocabulary)).astype(np.float64)
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        avg_length = doc_lengths.mean() if len(self.jobs) else 1.0
+        norm = k1 * (1 - b + b * doc_lengths[self._docs] / (avg_length or 1.0))
+        self._weights = idf[self._terms] * tf * (k1 + 1) / (tf + norm)
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def scores(self, query_text):
+        import numpy as np
+        query_terms = [self.vocabulary[t] for t in set(tokenize(query_text)) if t in self.vocabulary]
+        if not query_terms or not len(self.jobs):
+            return np.zeros(len(self.jobs))
+        wanted = np.zeros(len(self.vocabulary), dtype=bool)
+        wanted[query_terms] = True
+        hits = wanted[self._terms]
+        return np.bincount(self._docs[hits], weights=self._weights[hits], minlength=len(self.jobs))
+
+    def top_k(self, query_text, k):
+        """Return up to `k` (job, score) pairs, best first."""
+        import numpy as np
+        scores = self.scores(query_text)
+        k = min(k, len(self.jobs))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self.jobs[i], float(scores[i])) for i in best]
+
+def rank_jobs(jobs, resume_text, k, query=""):
+    """Pick the `k` jobs most relevant to the resume (and search query)."""
+    index = JobIndex(jobs)
+    # The search query is short, so repeat it to keep it from being drowned out by the resume.
+    return [job for job, _ in index.top_k(f"{query} " * 5 + resume_text, k)]
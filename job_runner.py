@@ -0,0 +1,106 @@
+# job_runner.py (in-process background runner for agent runs)
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+import traceback
+import uuid
+
+# -------------------- CONFIG -------------------- #
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", "4"))
+MAX_EVENTS_PER_RUN = 2000
+FINISHED_RUN_TTL = 6 * 3600          # seconds finished runs stay queryable
+
+class RunState:
+    def __init__(self, run_id, label):
+        self.run_id = run_id
+        self.label = label
+        self.status = "queued"           # queued -> running -> done | failed
+        self.events = []
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running")
+
+class JobRunner:
+    """Runs long agent jobs on a worker pool and records their progress events.
+
+    `submit` returns a run ID immediately. The submitted function receives
+    its `run_id` and a `progress(stage, message, **data)` callback; every call is stored as an
+    event that UIs poll with `events(run_id, since)`. Runs live in the server
+    process, so a browser refresh can reattach to a run by its ID, and one
+    user's long run only occupies one worker.
+    """
+
+    def __init__(self, max_workers=MAX_CONCURRENT_RUNS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-run")
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, label="", on_done=None, **kwargs):
+        self._expire_finished()
+        run = RunState(uuid.uuid4().hex[:12], label)
+        with self._lock:
+            self._runs[run.run_id] = run
+        self._record(run, "queued", "Waiting for a free worker...")
+        self._executor.submit(self._execute, run, fn, args, kwargs, on_done)
+        return run.run_id
+
+    def _execute(self, run, fn, args, kwargs, on_done):
+        run.status = "running"
+        self._record(run, "started", "Run started.")
+        try:
+            fn(*args, progress=lambda stage, message, **data: self._record(run, stage, message, **data),
+               run_id=run.run_id, **kwargs)
+            run.status = "done"
+            self._record(run, "done", "Run finished.")
+        except Exception as e:
+            run.status = "failed"
+            run.error = str(e)
+            self._record(run, "failed", f"Run failed: {e}", traceback=traceback.format_exc())
+        finally:
+            run.finished = time.time()
+            if on_done:
+                try:
+                    on_done()
+                except Exception as e:
+                    print(f"⚠️ Cleanup for run {run.run_id} failed: {e}")
+
+    def _record(self, run, stage, message, **data):
+        event = {"time": time.time(), "stage": stage, "message": message, **data}
+        with self._lock:
+            run.events.append(event)
+            if len(run.events) > MAX_EVENTS_PER_RUN:
+                del run.events[1:len(run.events) - MAX_EVENTS_PER_RUN + 1]
+
+    def get(self, run_id):
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def events(self, run_id, since=0):
+        with self._lock:
+            run = self._runs.get(run_id)
+            return list(run.events[since:]) if run else []
+
+    def runs(self):
+        with self._lock:
+            return sorted(self._runs.values(), key=lambda run: run.created, reverse=True)
+
+    def _expire_finished(self):
+        cutoff = time.time() - FINISHED_RUN_TTL
+        with self._lock:
+            for run_id in [r.run_id for r in self._runs.values() if r.finished and r.finished < cutoff]:
+                del self._runs[run_id]
+
+_default_runner = None
+_default_runner_lock = threading.Lock()
+
+def get_runner():
+    global _default_runner
+    with _default_runner_lock:
+        if _default_runner is None:
+            _default_runner = JobRunner()
+    return _default_runner
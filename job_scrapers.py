@@ -0,0 +1,360 @@
+# job_scrapers.py (concurrent multi-portal job scraping)
+import requests
+from requests.adapters import HTTPAdapter
+import html_parsing
+from html_parsing import cards
+from http_cache import HTTP_CACHE_ENABLED, get_http_cache
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from instrumentation import bind_context, count, span
+import hashlib
+import threading
+import queue
+import time
+import types
+from typing import TypedDict
+
+# -------------------- CONFIG -------------------- #
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+REQUEST_TIMEOUT = (5, 15)          # (connect, read) seconds per request
+PORTAL_TIME_BUDGET = 30            # seconds a portal may spend fetching and parsing all of its pages
+MAX_CONNECTIONS_PER_HOST = 4
+DEFAULT_MAX_PAGES = 5
+PAGE_PREFETCH = 3             # result pages of one portal fetched concurrently ahead of the caller
+STREAM_BUFFER_SIZE = 50       # jobs buffered ahead of a slow consumer
+STREAM_POLL_INTERVAL = 0.5    # seconds between budget checks while waiting for pages
+# Part of every parse-cache key. Edits to a parse function invalidate its
+# cached results automatically; bump this for changes outside them (e.g.
+# html_parsing.cards or the parser backend).
+PARSER_VERSION = 1
+
+_session = None
+_session_lock = threading.Lock()
+
+# -------------------- Shared HTTP Session -------------------- #
+def get_session():
+    """Return the process-wide keep-alive session, creating it on first use.
+
+    Each host gets its own urllib3 pool capped at MAX_CONNECTIONS_PER_HOST;
+    extra requests to the same host block until a connection is free.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=MAX_CONNECTIONS_PER_HOST, pool_block=True)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+def fetch_page(url, session=None, timeout=REQUEST_TIMEOUT):
+    session = session or get_session()
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+# -------------------- Indeed -------------------- #
+def indeed_search_url(query, location, page=0, base_url="https://www.indeed.com"):
+    url = f"{base_url}/jobs?q={query}&l={location}"
+    if page:
+        url += f"&start={page * 10}"
+    return url
+
+def parse_indeed_page(html, base_url="https://www.indeed.com"):
+    jobs = []
+    for card in cards(html, 'a', 'tapItem'):
+        title = card.find('h2', class_='jobTitle')
+        company = card.find(class_='companyName')
+        description = card.find(class_='job-snippet')
+        link = card.get('href')
+        if title and company and description and link:
+            jobs.append({
+                'title': title.text.strip(),
+                'company': company.text.strip(),
+                'description': description.text.strip().replace('\n', ''),
+                'url': f"{base_url}{link}",
+                'source': 'Indeed'
+            })
+    return jobs
+
+# -------------------- SimplyHired -------------------- #
+def simplyhired_search_url(query, location, page=0, base_url="https://www.simplyhired.com"):
+    url = f"{base_url}/search?q={query.replace(' ', '+')}&l={location.replace(' ', '+')}"
+    if page:
+        url += f"&pn={page + 1}"
+    return url
+
+def parse_simplyhired_page(html, base_url="https://www.simplyhired.com"):
+    jobs = []
+    for card in cards(html, 'div', 'SerpJob-jobCard'):
+        title = card.find('a', class_='SerpJob-link')
+        company = card.find(class_='JobPosting-labelWithIcon')
+        description = card.find(class_='SerpJob-snippet')
+        if title and company and description:
+            link = title['href']
+            jobs.append({
+                'title': title.text.strip(),
+                'company': company.text.strip(),
+                'description': description.text.strip(),
+                'url': f"{base_url}{link}",
+                'source': 'SimplyHired'
+            })
+    return jobs
+
+# -------------------- Monster -------------------- #
+def monster_search_url(query, location, page=0, base_url="https://www.monster.com"):
+    url = f"{base_url}/jobs/search/?q={query.replace(' ', '-')}&where={location.replace(' ', '-')}"
+    if page:
+        url += f"&page={page + 1}"
+    return url
+
+def parse_monster_page(html, base_url="https://www.monster.com"):
+    jobs = []
+    for card in cards(html, 'section', 'card-content'):
+        title = card.find('h2', class_='title')
+        company = card.find('div', class_='company')
+        location_tag = card.find('div', class_='location')
+        link = card.find('a', href=True)
+        if title and company and link:
+            jobs.append({
+                'title': title.text.strip(),
+                'company': company.text.strip(),
+                'description': location_tag.text.strip() if location_tag else '',
+                'url': link['href'],
+                'source': 'Monster'
+            })
+    return jobs
+
+# -------------------- Scraper Registry -------------------- #
+@lru_cache(maxsize=None)
+def parser_fingerprint(parse_page):
+    """Hash of a parse function's bytecode, constants and names (nested functions included)."""
+    digest = hashlib.sha1()
+
+    def feed(code):
+        digest.update(code.co_code)
+        digest.update(repr(code.co_names).encode("utf-8"))
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                feed(const)              # its repr would include a memory address
+            else:
+                digest.update(repr(const).encode("utf-8"))
+
+    code = getattr(parse_page, "__code__", None)
+    if code is None:                     # e.g. a callable object or builtin
+        return "v0"
+    feed(code)
+    return digest.hexdigest()[:16]
+
+class Job(TypedDict):
+    title: str
+    company: str
+    description: str
+    url: str
+    source: str
+
+class ScraperPlugin:
+    """A job portal: how to build its search URLs and parse one result page."""
+
+    def __init__(self, name, search_url, parse_page, base_url, max_pages=DEFAULT_MAX_PAGES):
+        self.name = name
+        self.search_url = search_url
+        self.parse_page = parse_page
+        self.base_url = base_url
+        self.max_pages = max_pages
+
+    def scrape_page(self, query, location, page=0, session=None, timeout=REQUEST_TIMEOUT, base_url=None):
+        base_url = base_url or self.base_url
+        url = self.search_url(query, location, page, base_url)
+        if not HTTP_CACHE_ENABLED:
+            with span("scrape.fetch", portal=self.name, page=page):
+                html = fetch_page(url, session=session, timeout=timeout)
+            with span("scrape.parse", portal=self.name, page=page):
+                jobs = html_parsing.parse_page(self.parse_page, html, base_url)
+            count("jobs.scraped", len(jobs))
+            return jobs
+
+        # Unchanged pages (same body hash) reuse the jobs parsed last time.
+        cache = get_http_cache()
+        with span("scrape.fetch", portal=self.name, page=page) as attrs:
+            response = cache.fetch(url, session or get_session(), timeout, portal=self.name)
+            attrs["cache"] = response.status
+        parser = (f"{self.name}:{self.parse_page.__module__}.{self.parse_page.__qualname__}"
+                  f"@{parser_fingerprint(self.parse_page)}:v{PARSER_VERSION}:{base_url}")
+        jobs = cache.parsed(response.body_hash, parser)
+        if jobs is None:
+            with span("scrape.parse", portal=self.name, page=page):
+                jobs = html_parsing.parse_page(self.parse_page, response.text, base_url)
+            cache.store_parsed(response.body_hash, parser, jobs)
+        count("jobs.scraped", len(jobs))
+        return jobs
+
+    def iter_jobs(self, query, location, limit=None, max_pages=None, session=None,
+                  timeout=REQUEST_TIMEOUT, base_url=None, time_budget=None, prefetch=PAGE_PREFETCH):
+        """Yield jobs page by page until `limit` jobs, an empty page or `max_pages`.
+
+        After the first page, up to `prefetch` pages are fetched concurrently
+        ahead of the one being yielded, but never more than the first page's
+        size says `limit` needs. Later pages are only requested as the caller
+        asks for more jobs, so a consumer that stops early skips them.
+        `time_budget` caps the seconds spent waiting for pages, not the caller's time.
+        """
+        max_pages = max_pages or self.max_pages
+        executor = ThreadPoolExecutor(max_workers=max(1, min(prefetch, max_pages)))
+        pending = deque()
+        next_page = 0
+        page_size = None          # jobs on the first page; sizes the prefetch window for `limit`
+        yielded = 0
+        spent = 0.0
+        try:
+            while True:
+                window = 1 if page_size is None else max(1, prefetch)
+                while next_page < max_pages and len(pending) < window:
+                    if page_size and limit is not None and next_page * page_size >= limit:
+                        break         # the pages already requested cover the limit
+                    pending.append(executor.submit(bind_context(self.scrape_page), query, location, next_page,
+                                                   session=session, timeout=timeout, base_url=base_url))
+                    next_page += 1
+                if not pending:
+                    return
+                if time_budget is not None and spent >= time_budget:
+                    print(f"⏱️ {self.name} exceeded its {time_budget}s budget; keeping partial results.")
+                    return
+                started = time.monotonic()
+                jobs = pending.popleft().result()
+                spent += time.monotonic() - started
+                if not jobs:
+                    return
+                if page_size is None:
+                    page_size = len(jobs)
+                for job in jobs:
+                    yield job
+                    yielded += 1
+                    if limit is not None and yielded >= limit:
+                        return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+SCRAPERS = {}
+
+def register_scraper(plugin):
+    SCRAPERS[plugin.name] = plugin
+    return plugin
+
+register_scraper(ScraperPlugin('Indeed', indeed_search_url, parse_indeed_page, "https://www.indeed.com"))
+register_scraper(ScraperPlugin('SimplyHired', simplyhired_search_url, parse_simplyhired_page, "https://www.simplyhired.com"))
+register_scraper(ScraperPlugin('Monster', monster_search_url, parse_monster_page, "https://www.monster.com"))
+
+def scrape_indeed_jobs(query="data analyst", location="remote", limit=None, pages=None, session=None, timeout=REQUEST_TIMEOUT):
+    return list(SCRAPERS['Indeed'].iter_jobs(query, location, limit=limit, max_pages=pages, session=session, timeout=timeout))
+
+def scrape_simplyhired_jobs(query="data analyst", location="remote", limit=None, pages=None, session=None, timeout=REQUEST_TIMEOUT):
+    return list(SCRAPERS['SimplyHired'].iter_jobs(query, location, limit=limit, max_pages=pages, session=session, timeout=timeout))
+
+def scrape_monster_jobs(query="data analyst", location="remote", limit=None, pages=None, session=None, timeout=REQUEST_TIMEOUT):
+    return list(SCRAPERS['Monster'].iter_jobs(query, location, limit=limit, max_pages=pages, session=session, timeout=timeout))
+
+# -------------------- Streaming Multi-Portal Scraper -------------------- #
+_PORTAL_DONE = object()
+
+def stream_jobs_from_all_sources(query="data analyst", location="remote", limit=None, pages=None, portals=None,
+                                 time_budget=PORTAL_TIME_BUDGET, timeout=REQUEST_TIMEOUT, base_urls=None):
+    """Lazily yield jobs from every registered portal as their pages arrive.
+
+    One producer thread per portal follows pagination, prefetching up to
+    PAGE_PREFETCH pages at a time, and feeds a bounded buffer, so the
+    caller can start working on the first job while later pages are still
+    downloading. Once `limit` jobs have been yielded, or the
+    caller closes the generator, producers stop fetching further pages.
+
+    `time_budget` caps the seconds each portal spends fetching and parsing;
+    time spent waiting for the caller does not count. A portal that runs
+    over, including one stuck in a hanging request, is abandoned and the
+    jobs it already delivered are kept.
+    """
+    print("🔍 Streaming jobs from multiple portals...")
+    portals = list(portals or SCRAPERS)
+    base_urls = base_urls or {}
+    session = get_session()
+    buffer = queue.Queue(maxsize=STREAM_BUFFER_SIZE)
+    stop = threading.Event()
+    abandoned = set()
+    busy = {}                 # portal -> deadline while it is fetching or parsing a page
+    busy_lock = threading.Lock()
+
+    def offer(portal, item):
+        while not stop.is_set() and portal not in abandoned:
+            try:
+                buffer.put((portal, item), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(portal):
+        jobs = SCRAPERS[portal].iter_jobs(query, location, limit=limit, max_pages=pages, session=session,
+                                          timeout=timeout, base_url=base_urls.get(portal))
+        spent = 0.0
+        try:
+            while True:
+                started = time.monotonic()
+                if time_budget is not None:
+                    with busy_lock:
+                        busy[portal] = started + time_budget - spent
+                try:
+                    job = next(jobs)          # fetches and parses the next page when needed
+                except StopIteration:
+                    return
+                finally:
+                    with busy_lock:
+                        busy.pop(portal, None)
+                    spent += time.monotonic() - started
+                if not offer(portal, job):
+                    return
+        except Exception as e:
+            print(f"❌ Failed scraping {portal}: {e}")
+        finally:
+            jobs.close()
+            offer(portal, _PORTAL_DONE)
+
+    for portal in portals:
+        threading.Thread(target=bind_context(produce), args=(portal,), daemon=True).start()
+
+    running = set(portals)
+    yielded = 0
+    try:
+        while running and (limit is None or yielded < limit):
+            # Poll so a portal that becomes busy after this check is still bounded.
+            with busy_lock:
+                deadlines = [busy[portal] for portal in running if portal in busy]
+            wait_for = min([STREAM_POLL_INTERVAL] + [deadline - time.monotonic() for deadline in deadlines])
+            try:
+                portal, item = buffer.get(timeout=max(wait_for, 0.0))
+            except queue.Empty:
+                now = time.monotonic()
+                with busy_lock:
+                    overdue = [portal for portal in running if busy.get(portal, now + 1) <= now]
+                for portal in overdue:
+                    print(f"⏱️ {portal} exceeded its {time_budget}s budget; keeping partial results.")
+                    abandoned.add(portal)
+                    running.discard(portal)
+                continue
+            if portal not in running:
+                continue              # late results from an abandoned portal
+            if item is _PORTAL_DONE:
+                running.discard(portal)
+                continue
+            yield item
+            yielded += 1
+    finally:
+        stop.set()
+
+# -------------------- Unified Multi-Portal Scraper -------------------- #
+def scrape_jobs_from_all_sources(query="data analyst", location="remote", limit=None, pages=None, portals=None,
+                                 time_budget=PORTAL_TIME_BUDGET, timeout=REQUEST_TIMEOUT, base_urls=None):
+    """The first `limit` jobs of stream_jobs_from_all_sources as a list, in arrival order."""
+    return list(stream_jobs_from_all_sources(query, location, limit=limit, pages=pages, portals=portals,
+                                             time_budget=time_budget, timeout=timeout, base_urls=base_urls))
@@ -1,122 +1,50 @@
 # job_search_ai_agent.py
-import streamlit as st
-import openai
-import PyPDF2
-import requests
-from bs4 import BeautifulSoup
-from dotenv import load_dotenv
+#
+# Imports here stay light so `--help`, batch runs and UI reruns start fast:
+# scrapers (requests/bs4/lxml), deduplication (numpy), the openai client and
+# selenium are imported by the stage that first needs them. Configuration
+# (API key, API base) is resolved once, on first use, by settings.get_settings().
 import os
-import csv
-from datetime import datetime
 import argparse
-from multi_portal_bot import route_application, detect_portal
+import time
+import uuid
+from contextlib import nullcontext
+from itertools import islice
+from instrumentation import count, profile, run_tracer, span
+from llm_cache import get_cache, make_key
+from resume_ingest import extract_resume_text
+from job_ranking import rank_jobs
+from application_store import get_store, log_application
+from llm_pipeline import get_pipeline, new_pipeline
+from prompt_builder import (
+    COVER_LETTER_RESUME_BUDGET,
+    TAILOR_RESUME_BUDGET,
+    compact_job_description,
+    compact_resume,
+    prompt_stats,
+    record_prompt,
+)
+from multi_portal_bot import route_applications, detect_portal
 
 # -------------------- CONFIG -------------------- #
-load_dotenv()
-print("🔐 API Key Loaded:", os.getenv("OPENAI_API_KEY"))
-openai.api_key = os.getenv("OPENAI_API_KEY")
-openai.api_key = st.secrets["openai"]["api_key"]
-LOG_FILE = "application_log.csv"
-
-# -------------------- Extract Resume Text -------------------- #
-
-def extract_resume_text(file_path):
-    if os.path.getsize(file_path) == 0:
-        raise ValueError(f"🚫 Error: {file_path} is empty.")
-    with open(file_path, 'rb') as f:
-        reader = PyPDF2.PdfReader(f)
-        text = ''
-        for page in reader.pages:
-            text += page.extract_text()
-    return text
-
-# -------------------- Scrape Jobs from Indeed -------------------- #
-def scrape_indeed_jobs(query="data analyst", location="remote"):
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    url = f"https://www.indeed.com/jobs?q={query}&l={location}"
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    jobs = []
-    for card in soup.select('a.tapItem'):
-        title = card.select_one('h2.jobTitle')
-        company = card.select_one('.companyName')
-        description = card.select_one('.job-snippet')
-        link = card['href']
-        if title and company and description and link:
-            jobs.append({
-                'title': title.text.strip(),
-                'company': company.text.strip(),
-                'description': description.text.strip().replace('\n', ''),
-                'url': f"https://www.indeed.com{link}",
-                'source': 'Indeed'
-            })
-    return jobs
-
-# -------------------- Scrape Jobs from SimplyHired -------------------- #
-def scrape_simplyhired_jobs(query="data analyst", location="remote"):
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    url = f"https://www.simplyhired.com/search?q={query.replace(' ', '+')}&l={location.replace(' ', '+')}"
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    jobs = []
-    for card in soup.select('div.SerpJob-jobCard'):
-        title = card.select_one('a.SerpJob-link')
-        company = card.select_one('.JobPosting-labelWithIcon')
-        description = card.select_one('.SerpJob-snippet')
-        if title and company and description:
-            link = title['href']
-            jobs.append({
-                'title': title.text.strip(),
-                'company': company.text.strip(),
-                'description': description.text.strip(),
-                'url': f"https://www.simplyhired.com{link}",
-                'source': 'SimplyHired'
-            })
-    return jobs
-
-# -------------------- Scrape Jobs from Monster -------------------- #
-def scrape_monster_jobs(query="data analyst", location="remote"):
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    url = f"https://www.monster.com/jobs/search/?q={query.replace(' ', '-')}&where={location.replace(' ', '-')}"
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    jobs = []
-    for card in soup.select('section.card-content'):
-        title = card.select_one('h2.title')
-        company = card.select_one('div.company')
-        location_tag = card.select_one('div.location')
-        link = card.select_one('a')
-        if title and company and link:
-            jobs.append({
-                'title': title.text.strip(),
-                'company': company.text.strip(),
-                'description': location_tag.text.strip() if location_tag else '',
-                'url': link['href'],
-                'source': 'Monster'
-            })
-    return jobs
-
-# -------------------- Unified Multi-Portal Scraper -------------------- #
-def scrape_jobs_from_all_sources(query="data analyst", location="remote"):
-    print("🔍 Scraping from multiple portals...")
-    jobs = []
-    try:
-        jobs.extend(scrape_indeed_jobs(query, location))
-    except Exception as e:
-        print(f"❌ Failed scraping Indeed: {e}")
-    try:
-        jobs.extend(scrape_simplyhired_jobs(query, location))
-    except Exception as e:
-        print(f"❌ Failed scraping SimplyHired: {e}")
-    try:
-        jobs.extend(scrape_monster_jobs(query, location))
-    except Exception as e:
-        print(f"❌ Failed scraping Monster: {e}")
-    return jobs
+MODEL = "gpt-4"
+COVER_LETTER_TEMPLATE_VERSION = "agent-cover-letter-v2"
+TAILOR_RESUME_TEMPLATE_VERSION = "agent-tailor-resume-v2"
+
+# -------------------- GPT Completion -------------------- #
+def _complete(prompt, kind, pipeline=None):
+    record_prompt(kind, prompt, model=MODEL)
+    return (pipeline or get_pipeline()).complete(prompt, model=MODEL, temperature=0.7)
 
 # -------------------- GPT Cover Letter Generator -------------------- #
-def generate_cover_letter(job_title, company, job_description, resume_text, first_name, last_name):
-    prompt = f"""
+def _cover_letter_inputs(job_title, company, job_description, resume_text, first_name, last_name):
+    # Compact once so the prompt and its cache key see the same text.
+    job_description = compact_job_description(job_description)
+    resume_text = compact_resume(resume_text, job_description, budget=COVER_LETTER_RESUME_BUDGET, model=MODEL)
+    return job_title, company, job_description, resume_text, first_name, last_name
+
+def _cover_letter_prompt(job_title, company, job_description, resume_text, first_name, last_name):
+    return f"""
 You are a career assistant AI. Write a professional, concise cover letter for the following job.
 
 Job Title: {job_title}
@@ -135,16 +63,25 @@ Guidelines:
 - Keep it under 300 words
 - End with: Sincerely, {first_name} {last_name}
 """
-    response = openai.ChatCompletion.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7
-    )
-    return response['choices'][0]['message']['content']
+
+def _cover_letter_key(job_title, company, job_description, resume_text, first_name, last_name):
+    return make_key(MODEL, COVER_LETTER_TEMPLATE_VERSION, resume_text, job_description,
+                    job_title=job_title, company=company, first_name=first_name, last_name=last_name)
+
+def generate_cover_letter(job_title, company, job_description, resume_text, first_name, last_name, pipeline=None):
+    args = _cover_letter_inputs(job_title, company, job_description, resume_text, first_name, last_name)
+    prompt = _cover_letter_prompt(*args)
+    return get_cache().get_or_create(_cover_letter_key(*args), lambda: _complete(prompt, "cover_letter", pipeline),
+                                     kind="cover_letter")
 
 # -------------------- GPT Resume Tailoring -------------------- #
-def tailor_resume(job_description, resume_text):
-    prompt = f"""
+def _tailor_resume_inputs(job_description, resume_text):
+    job_description = compact_job_description(job_description)
+    resume_text = compact_resume(resume_text, job_description, budget=TAILOR_RESUME_BUDGET, model=MODEL)
+    return job_description, resume_text
+
+def _tailor_resume_prompt(job_description, resume_text):
+    return f"""
 You are a resume assistant. Given this resume and job description, rewrite the resume to match the job.
 
 Job Description:
@@ -155,83 +92,131 @@ Resume:
 
 Return the tailored resume only, preserving professionalism and formatting.
 """
-    response = openai.ChatCompletion.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7
-    )
-    return response['choices'][0]['message']['content']
-
-# -------------------- Application Logger -------------------- #
-def log_application(first_name, last_name, email, job_url, portal, status):
-    headers = ["First Name", "Last Name", "Email", "Job URL", "Portal", "Status", "Timestamp"]
-    row = [
-        first_name,
-        last_name,
-        email,
-        job_url,
-        portal,
-        status,
-        datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    ]
-    file_exists = os.path.isfile(LOG_FILE)
-    with open(LOG_FILE, mode="a", newline="") as file:
-        writer = csv.writer(file)
-        if not file_exists:
-            writer.writerow(headers)
-        writer.writerow(row)
-
-# -------------------- Main Agent Function -------------------- #
-def run_job_search_agent(first_name, last_name, email, resume_path, query, location):
-    if not os.path.exists(resume_path):
-        print(f"❌ Resume not found at {resume_path}")
-        return
-
-    print("✅ Extracting resume...")
-    resume_text = extract_resume_text(resume_path)
-
-    print("✅ Scraping jobs from multiple sources...")
-    jobs = scrape_jobs_from_all_sources(query=query, location=location)
 
-    os.makedirs("output", exist_ok=True)
+def tailor_resume(job_description, resume_text, pipeline=None):
+    job_description, resume_text = _tailor_resume_inputs(job_description, resume_text)
+    prompt = _tailor_resume_prompt(job_description, resume_text)
+    key = make_key(MODEL, TAILOR_RESUME_TEMPLATE_VERSION, resume_text, job_description)
+    return get_cache().get_or_create(key, lambda: _complete(prompt, "tailored_resume", pipeline),
+                                     kind="tailored_resume")
 
-    for i, job in enumerate(jobs[:5]):
-        print(f"\n📌 Job {i+1}: {job['title']} at {job['company']} ({job['source']})")
-
-        job_url = job['url']
-        job_title = job['title']
-        company = job['company']
-        description = job['description']
-
-        print("✍️ Generating cover letter...")
-        cover_letter = generate_cover_letter(job_title, company, description, resume_text, first_name, last_name)
-
-        print("🧩 Tailoring resume to job description...")
-        tailored_resume = tailor_resume(description, resume_text)
-
-        # Save tailored resume to file for review
-        resume_file = f"output/tailored_resume_{i+1}_{company.replace(' ', '_')}.txt"
-        with open(resume_file, 'w', encoding='utf-8') as f:
-            f.write(tailored_resume)
-
-        user_info = {
-            "first_name": first_name,
-            "last_name": last_name,
-            "email": email,
-            "cover_letter": cover_letter
-        }
-
-        print(f"🧠 Detecting portal from URL: {job_url}")
-        portal = detect_portal(job_url)
-        print(f"🔍 Detected portal: {portal}")
-
-        try:
-            print("🛠️ Simulating application (no submission)...")
-            route_application(job_url, resume_path, user_info)
-            log_application(first_name, last_name, email, job_url, portal, "Success")
-        except Exception as e:
-            print(f"❌ Error during simulation: {e}")
-            log_application(first_name, last_name, email, job_url, portal, f"Error: {e}")
+# -------------------- Main Agent Function -------------------- #
+def run_job_search_agent(first_name, last_name, email, resume_path, query, location, pages=None, limit=5,
+                         concurrency=4, requests_per_minute=None, tokens_per_minute=None,
+                         browser_workers=None, review=False, candidates=100, progress=None, trace_path=None,
+                         base_urls=None, run_id=None):
+    """Scrape, rank, generate and simulate applications for one search.
+
+    Runs may overlap in one process (see job_runner): each gets its own
+    generation pipeline (sharing the process-wide rate limiter), records its
+    spans in its own tracer for the summary, and writes its files under
+    output/<run_id>/.
+    """
+    def report(stage, message, **data):
+        # Progress goes to stdout for the CLI and to `progress` for background runs.
+        print(message)
+        if progress:
+            progress(stage, message, **data)
+
+    with run_tracer() as trace:
+        if not os.path.exists(resume_path):
+            report("resume", f"❌ Resume not found at {resume_path}")
+            return
+
+        report("resume", "✅ Extracting resume...")
+        with span("agent.resume"):
+            resume_text = extract_resume_text(resume_path)
+
+        report("scrape", "✅ Scraping jobs from multiple sources...")
+        from job_dedup import JobDeduplicator
+        from job_scrapers import stream_jobs_from_all_sources
+        # Duplicates across portals and jobs already applied to are dropped as they stream in,
+        # so the limits below count only new postings.
+        dedup = JobDeduplicator(store=get_store())
+        scraped = dedup.filter(stream_jobs_from_all_sources(query=query, location=location, pages=pages,
+                                                                 base_urls=base_urls))
+        if candidates:
+            # Rank a wider pool locally and spend GPT calls only on the best matches.
+            with span("agent.scrape", candidates=candidates):
+                scraped = list(islice(scraped, candidates))
+            report("rank", f"📊 Ranking {len(scraped)} new jobs against the resume ({dedup.skipped} duplicates skipped)...",
+                   scraped=len(scraped), duplicates=dedup.skipped)
+            with span("agent.rank", jobs=len(scraped)):
+                jobs = rank_jobs(scraped, resume_text, limit, query=query)
+        else:
+            jobs = islice(scraped, limit)
+        jobs_by_url = {}
+
+        run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        output_dir = os.path.join("output", run_id)
+        os.makedirs(output_dir, exist_ok=True)
+        pipeline = new_pipeline(concurrency=concurrency, requests_per_minute=requests_per_minute,
+                                tokens_per_minute=tokens_per_minute)
+
+        def prepare(job):
+            with span("generate.cover_letter"):
+                cover_letter = generate_cover_letter(job['title'], job['company'], job['description'],
+                                                     resume_text, first_name, last_name, pipeline=pipeline)
+            with span("generate.tailor_resume"):
+                tailored_resume = tailor_resume(job['description'], resume_text, pipeline=pipeline)
+            return cover_letter, tailored_resume
+
+        def applications():
+            report("generate", f"✍️ Generating cover letters and tailored resumes ({concurrency} at a time)...")
+            for i, (job, generated, error) in enumerate(pipeline.run(jobs, prepare)):
+                report("generate", f"📌 Job {i+1}: {job['title']} at {job['company']} ({job['source']})", job=i + 1)
+
+                job_url = job['url']
+                company = job['company']
+
+                if error:
+                    report("generate", f"❌ Generation failed: {error}", job=i + 1)
+                    log_application(first_name, last_name, email, job_url, detect_portal(job_url), f"Error: {error}")
+                    continue
+                cover_letter, tailored_resume = generated
+
+                # Save tailored resume to file for review
+                resume_file = os.path.join(output_dir, f"tailored_resume_{i+1}_{company.replace(' ', '_')}.txt")
+                with open(resume_file, 'w', encoding='utf-8') as f:
+                    f.write(tailored_resume)
+
+                user_info = {
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "email": email,
+                    "cover_letter": cover_letter
+                }
+
+                report("apply", f"🛠️ Queueing application simulation (no submission) for {job_url}", job=i + 1)
+                jobs_by_url[job_url] = job
+                yield job_url, resume_path, user_info
+
+        for (job_url, _, _), result, error in route_applications(applications(), workers=browser_workers, review=review):
+            portal = detect_portal(job_url)
+            if error or not result.ok:
+                reason = error or result.error or f"invalid fields: {', '.join(result.validation_errors)}"
+                report("apply", f"❌ Error during simulation of {job_url} ({portal}): {reason}", url=job_url)
+                log_application(first_name, last_name, email, job_url, portal, f"Error: {reason}")
+            else:
+                report("apply", f"✅ Simulated application for {job_url} ({portal}) in {result.elapsed:.1f}s", url=job_url)
+                log_application(first_name, last_name, email, job_url, portal, "Success")
+                dedup.mark_applied(jobs_by_url[job_url])
+
+        if dedup.skipped:
+            count("jobs.duplicates", dedup.skipped)
+            report("summary", f"🧹 Skipped {dedup.skipped} duplicate or already-applied postings")
+        get_store().flush()
+        report("summary", f"📁 Tailored resumes saved under {output_dir}")
+        # Everything below comes from this run's tracer, not the process-wide totals.
+        counters = trace.counters()
+        report("summary", f"♻️ LLM cache: {counters.get('llm_cache.hits', 0)} hits, "
+                          f"{counters.get('llm_cache.misses', 0)} misses ({get_cache().stats()['entries']} entries stored)")
+        for kind, totals in prompt_stats(counters).items():
+            report("summary", f"🧮 {kind}: {totals['calls']} calls, {totals['avg_tokens']:.0f} prompt tokens per call",
+                   kind=kind, **totals)
+        report("summary", "⏱️ Stage timings:\n" + trace.summary_table(), stages=trace.summary())
+        if trace_path:
+            report("summary", f"🗂️ Trace written to {trace.export(trace_path)}")
 
 # -------------------- Command Line Entry -------------------- #
 if __name__ == '__main__':
@@ -242,14 +227,35 @@ if __name__ == '__main__':
     parser.add_argument("--resume", help="Path to resume PDF", required=True)
     parser.add_argument("--query", help="Job title to search", required=True)
     parser.add_argument("--location", help="Job location", required=True)
+    parser.add_argument("--pages", help="Maximum result pages to follow per portal", type=int, default=None)
+    parser.add_argument("--limit", help="Number of jobs to process (batch size)", type=int, default=5)
+    parser.add_argument("--candidates", help="Jobs to scrape and rank before picking the top --limit (0 disables ranking)",
+                        type=int, default=100)
+    parser.add_argument("--concurrency", help="Parallel OpenAI requests", type=int, default=4)
+    parser.add_argument("--rpm", help="OpenAI requests-per-minute limit", type=int, default=None)
+    parser.add_argument("--tpm", help="OpenAI tokens-per-minute limit", type=int, default=None)
+    parser.add_argument("--browsers", help="Parallel browser workers filling forms", type=int, default=None)
+    parser.add_argument("--review", help="Pause on each filled form for human review", action="store_true")
+    parser.add_argument("--trace", help="Write a span trace (.json for Perfetto/chrome://tracing, or .csv)", default=None)
+    parser.add_argument("--profile", help="Run under cProfile and save the stats to this file", default=None)
 
     args = parser.parse_args()
 
-    run_job_search_agent(
-        first_name=args.first,
-        last_name=args.last,
-        email=args.email,
-        resume_path=args.resume,
-        query=args.query,
-        location=args.location
-    )
+    with profile(args.profile) if args.profile else nullcontext():
+        run_job_search_agent(
+            first_name=args.first,
+            last_name=args.last,
+            email=args.email,
+            resume_path=args.resume,
+            query=args.query,
+            location=args.location,
+            pages=args.pages,
+            limit=args.limit,
+            concurrency=args.concurrency,
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+            browser_workers=args.browsers,
+            review=args.review,
+            candidates=args.candidates,
+            trace_path=args.trace,
+        )
@@ -2,11 +2,22 @@
 import streamlit as st
 import os
 import tempfile
+import time
+from job_runner import get_runner
 from job_search_ai_agent import run_job_search_agent
 
+POLL_INTERVAL = 1.0          # seconds between progress refreshes while a run is active
+
 st.set_page_config(page_title="Felig AI Job Agent", page_icon="🤖")
 st.title("🤖 Felig AI Job Search Agent")
 
+@st.cache_resource
+def shared_runner():
+    # One worker pool per server process: runs survive reruns and browser refreshes.
+    return get_runner()
+
+runner = shared_runner()
+
 with st.form("job_search_form"):
     st.subheader("🔍 Search Criteria")
     first_name = st.text_input("First Name")
@@ -28,14 +39,37 @@ if submitted:
             temp_file.write(resume_file.read())
             resume_path = temp_file.name
 
-        st.success("✅ Starting job search and application simulation...")
-        run_job_search_agent(
+        run_id = runner.submit(
+            run_job_search_agent,
             first_name=first_name,
             last_name=last_name,
             email=email,
             resume_path=resume_path,
             query=query,
-            location=location
+            location=location,
+            label=f"{query} in {location}",
+            on_done=lambda: os.remove(resume_path),
         )
-        os.remove(resume_path)
+        # Keep the run ID in the URL so a browser refresh reattaches to it.
+        st.query_params["run"] = run_id
+        st.success(f"✅ Started job search and application simulation (run {run_id}).")
+
+run_id = st.query_params.get("run")
+run = runner.get(run_id) if run_id else None
+
+if run_id and run is None:
+    st.warning(f"Run {run_id} is no longer available.")
+elif run:
+    st.subheader(f"📡 Run {run.run_id}: {run.label}")
+    events = runner.events(run.run_id)
+    stages = [event["stage"] for event in events]
+    st.caption(f"Status: **{run.status}** · {len(events)} events · current stage: {stages[-1] if stages else 'queued'}")
+    st.code("\n".join(event["message"] for event in events[-200:]) or "Waiting for progress...", language=None)
+
+    if run.status == "done":
         st.success("✅ Job search and simulation completed. Check logs/output folder.")
+    elif run.status == "failed":
+        st.error(f"❌ Run failed: {run.error}")
+    else:
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
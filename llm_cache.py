@@ -0,0 +1,163 @@
+# llm_cache.py (persistent cache for GPT cover letters and tailored resumes)
+import hashlib
+import json
+from instrumentation import count
+import sqlite3
+import threading
+import time
+
+# -------------------- CONFIG -------------------- #
+CACHE_FILE = "llm_cache.sqlite3"
+DEFAULT_TTL = 7 * 24 * 3600           # seconds before a cached completion expires
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions (accessed);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# -------------------- Cache Keys -------------------- #
+def content_hash(text):
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+def make_key(model, template_version, resume_text, job_description, **params):
+    """Content-addressed key for one completion.
+
+    Resume and job description are hashed separately so the key stays small;
+    any other prompt inputs (names, company, ...) go in `params`.
+    """
+    payload = {
+        "model": model,
+        "template": template_version,
+        "resume": content_hash(resume_text),
+        "job": content_hash(job_description),
+        "params": params,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+# -------------------- SQLite-backed Cache -------------------- #
+class LLMCache:
+    def __init__(self, path=CACHE_FILE, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row and (self.ttl is None or now - row[1] <= self.ttl):
+                self._conn.execute("UPDATE completions SET accessed = ? WHERE key = ?", (now, key))
+                self._count("hits")
+                self.hits += 1
+                count("llm_cache.hits")
+                self._conn.commit()
+                return row[0]
+            if row:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            self._count("misses")
+            self.misses += 1
+            count("llm_cache.misses")
+            self._conn.commit()
+            return None
+
+    def set(self, key, content, kind="completion"):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, kind, content, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, content, len(content.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def get_or_create(self, key, producer, kind="completion"):
+        """Return the cached completion for `key`, calling `producer()` on a miss.
+
+        Only successful results are stored; exceptions from `producer`
+        propagate and leave the cache untouched.
+        """
+        content = self.get(key)
+        if content is None:
+            content = producer()
+            self.set(key, content, kind=kind)
+        return content
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+            totals = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": totals.get("hits", 0),
+            "total_misses": totals.get("misses", 0),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.execute("DELETE FROM counters")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _count(self, name):
+        self._conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def _evict(self, now):
+        # Expired rows first, then least-recently-used rows until both limits hold.
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM completions WHERE created < ?", (now - self.ttl,))
+        entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+        freed_entries = freed_bytes = 0
+        doomed = []
+        for key, row_size in self._conn.execute("SELECT key, size FROM completions ORDER BY accessed ASC"):
+            if entries - freed_entries <= self.max_entries and size - freed_bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            freed_entries += 1
+            freed_bytes += row_size
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", doomed)
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+    return _default_cache
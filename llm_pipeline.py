@@ -0,0 +1,310 @@
+# llm_pipeline.py (concurrent, rate-limited GPT generation)
+from instrumentation import bind_context, count, span
+from settings import configure_openai
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from collections import deque
+import random
+import sys
+import threading
+import time
+
+# -------------------- CONFIG -------------------- #
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 5
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def estimate_tokens(text):
+    # Rough OpenAI rule of thumb: ~4 characters per token.
+    return max(1, len(text) // 4)
+
+# -------------------- Rate Limiter -------------------- #
+class RateLimiter:
+    """Sliding one-minute window over requests and tokens.
+
+    `acquire` blocks until sending one more request of `tokens` tokens keeps
+    both the requests-per-minute and tokens-per-minute limits. A limit of
+    None disables that dimension.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, window=60.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self._sent = deque()          # (timestamp, tokens)
+        self._tokens_in_window = 0
+        self._lock = threading.Lock()
+
+    def set_limits(self, requests_per_minute=None, tokens_per_minute=None):
+        """Change the limits in place; requests already in the window still count."""
+        with self._lock:
+            self.requests_per_minute = requests_per_minute
+            self.tokens_per_minute = tokens_per_minute
+
+    def acquire(self, tokens=0):
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0][0] >= self.window:
+                    self._tokens_in_window -= self._sent.popleft()[1]
+                requests_ok = not self.requests_per_minute or len(self._sent) < self.requests_per_minute
+                tokens_ok = not self.tokens_per_minute or self._tokens_in_window + tokens <= self.tokens_per_minute
+                if requests_ok and tokens_ok:
+                    self._sent.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+                wait_for = self.window - (now - self._sent[0][0])
+            time.sleep(max(wait_for, 0.01))
+
+# -------------------- Retries -------------------- #
+def is_retryable(exc):
+    # openai is imported lazily; if it never was, `exc` cannot be one of its errors.
+    openai = sys.modules.get("openai")
+    if openai is not None and isinstance(exc, (openai.error.Timeout, openai.error.APIConnectionError,
+                                               openai.error.RateLimitError, openai.error.ServiceUnavailableError,
+                                               openai.error.TryAgain)):
+        return True
+    status = getattr(exc, "http_status", None)
+    return status in RETRYABLE_STATUS
+
+def _retry_after(exc):
+    headers = getattr(exc, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+def call_with_retries(fn, max_retries=DEFAULT_MAX_RETRIES, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """Call `fn()`, retrying 429/5xx and transport errors with jittered exponential backoff."""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = _retry_after(e) or min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"🔁 OpenAI call failed ({e}); retrying in {delay:.1f}s...")
+            count("openai.retries")
+            time.sleep(delay)
+            attempt += 1
+
+# -------------------- Streaming Completions -------------------- #
+class CompletionStream:
+    """Iterate a chat completion as text deltas while recording latency.
+
+    `time_to_first_token` and `elapsed` are filled in as the stream is
+    consumed. Iteration stops early when `cancel()` is called (or the
+    `cancel_event` is set) or once `max_tokens` deltas have arrived. Only a
+    stream the model finished itself (finish_reason "stop") calls
+    `on_complete(text)`, so a cancelled or length-capped partial result is
+    never stored for the application step.
+    """
+
+    def __init__(self, open_stream=None, max_tokens=None, cancel_event=None, on_complete=None, text=None):
+        self._open_stream = open_stream
+        self.max_tokens = max_tokens
+        self.cancel_event = cancel_event or threading.Event()
+        self.on_complete = on_complete
+        self.parts = [text] if text is not None else []
+        self.tokens = 0
+        self.time_to_first_token = 0.0 if text is not None else None
+        self.elapsed = 0.0 if text is not None else None
+        self.finish_reason = "stop" if text is not None else None
+        self.cancelled = False
+        self.truncated = False
+
+    @classmethod
+    def from_text(cls, text):
+        """A finished stream for text that is already available (e.g. a cache hit)."""
+        return cls(text=text)
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def __iter__(self):
+        if self._open_stream is None:
+            yield from self.parts
+            return
+        started = time.monotonic()
+        chunks = None
+        try:
+            chunks = self._open_stream()
+            for chunk in chunks:
+                if self.cancel_event.is_set():
+                    self.cancelled = True
+                    break
+                choice = chunk['choices'][0]
+                if choice.get('finish_reason'):
+                    self.finish_reason = choice['finish_reason']
+                    self.truncated = self.finish_reason == "length"
+                delta = choice.get('delta', {}).get('content')
+                if not delta:
+                    continue
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = time.monotonic() - started
+                self.parts.append(delta)
+                self.tokens += 1            # one delta is (about) one token
+                yield delta
+                if self.max_tokens and self.tokens >= self.max_tokens:
+                    self.truncated = True
+                    break
+        except GeneratorExit:
+            self.cancelled = True
+            raise
+        finally:
+            self.elapsed = time.monotonic() - started
+            if hasattr(chunks, "close"):
+                chunks.close()
+        if not self.cancelled:
+            ttft = f"{self.time_to_first_token:.2f}s" if self.time_to_first_token is not None else "n/a"
+            count("openai.streamed_tokens", self.tokens)
+            print(f"⏱️ Streamed {self.tokens} tokens: first output after {ttft}, complete after {self.elapsed:.2f}s")
+            if self.on_complete and self.finish_reason == "stop" and not self.truncated:
+                self.on_complete(self.text)
+
+# -------------------- Generation Pipeline -------------------- #
+class GenerationPipeline:
+    """Concurrency cap, retries and rate limiting for one run's completions.
+
+    Pass `limiter` to share a RateLimiter between pipelines; otherwise the
+    pipeline gets its own from `requests_per_minute`/`tokens_per_minute`.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, requests_per_minute=None, tokens_per_minute=None,
+                 max_retries=DEFAULT_MAX_RETRIES, limiter=None):
+        self.concurrency = concurrency
+        self.limiter = limiter or RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries
+        self._slots = threading.BoundedSemaphore(concurrency)
+
+    def complete(self, prompt, model="gpt-4", temperature=0.7, max_tokens=None):
+        """One chat completion, subject to the concurrency cap, rate limits and retries."""
+        budget = estimate_tokens(prompt) + (max_tokens or 0)
+        extra = {"max_tokens": max_tokens} if max_tokens else {}
+
+        openai = configure_openai()
+
+        def attempt():
+            with span("openai.rate_limit_wait"):
+                self.limiter.acquire(budget)
+            with self._slots, span("openai.complete", model=model):
+                response = openai.ChatCompletion.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    **extra
+                )
+            return response['choices'][0]['message']['content']
+
+        return call_with_retries(attempt, max_retries=self.max_retries)
+
+    def stream(self, prompt, model="gpt-4", temperature=0.7, max_tokens=None, cancel_event=None, on_complete=None):
+        """Start a streaming completion; see CompletionStream.
+
+        Rate limiting and retries apply to opening the stream. The
+        concurrency slot is held until the stream is exhausted or closed.
+        """
+        extra = {"max_tokens": max_tokens} if max_tokens else {}
+        openai = configure_openai()
+
+        def open_stream():
+            with span("openai.rate_limit_wait"):
+                self.limiter.acquire(estimate_tokens(prompt) + (max_tokens or 0))
+            self._slots.acquire()
+            try:
+                with span("openai.stream_open", model=model):
+                    chunks = call_with_retries(lambda: openai.ChatCompletion.create(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature,
+                        stream=True,
+                        **extra
+                    ), max_retries=self.max_retries)
+            except Exception:
+                self._slots.release()
+                raise
+            return self._release_when_done(chunks)
+
+        return CompletionStream(open_stream, max_tokens=max_tokens, cancel_event=cancel_event, on_complete=on_complete)
+
+    def _release_when_done(self, chunks):
+        try:
+            yield from chunks
+        finally:
+            self._slots.release()
+
+    def run(self, items, generate):
+        """Apply `generate(item)` across `items` concurrently, yielding as each finishes.
+
+        Yields `(item, result, error)` tuples in completion order. `items` may
+        be a lazy iterator; at most twice `concurrency` items are pulled ahead
+        of the consumer, so a streaming job source is not drained up front.
+        """
+        items = iter(items)
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            def top_up():
+                while len(in_flight) < self.concurrency * 2:
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        return
+                    in_flight[executor.submit(bind_context(generate), item)] = item
+
+            top_up()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = in_flight.pop(future)
+                    error = future.exception()
+                    yield item, (None if error else future.result()), error
+                top_up()
+
+_shared_limiter = None
+_default_pipeline = None
+_default_pipeline_lock = threading.Lock()
+
+def shared_rate_limiter(requests_per_minute=None, tokens_per_minute=None):
+    """The process-wide RateLimiter: OpenAI's limits apply to the API key, not to one run.
+
+    Concurrent runs that each build their own pipeline all acquire from this
+    limiter, so their combined traffic stays within the limits. Limits passed
+    here replace the current ones without resetting the window.
+    """
+    global _shared_limiter
+    with _default_pipeline_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        elif requests_per_minute or tokens_per_minute:
+            _shared_limiter.set_limits(requests_per_minute, tokens_per_minute)
+    return _shared_limiter
+
+def new_pipeline(concurrency=DEFAULT_CONCURRENCY, requests_per_minute=None, tokens_per_minute=None, **kwargs):
+    """A pipeline for one run: its own concurrency cap, the shared rate limiter."""
+    return GenerationPipeline(concurrency=concurrency,
+                              limiter=shared_rate_limiter(requests_per_minute, tokens_per_minute), **kwargs)
+
+def configure_pipeline(**kwargs):
+    """Replace the default pipeline used by callers that do not pass one explicitly."""
+    global _default_pipeline
+    pipeline = new_pipeline(**kwargs)
+    with _default_pipeline_lock:
+        _default_pipeline = pipeline
+    return pipeline
+
+def get_pipeline():
+    global _default_pipeline
+    if _default_pipeline is None:
+        pipeline = new_pipeline()
+        with _default_pipeline_lock:
+            if _default_pipeline is None:
+                _default_pipeline = pipeline
+    return _default_pipeline
@@ -1,132 +1,88 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from instrumentation import bind_context, count, span
+from portal_specs import PORTAL_SPECS, detect_portal
+from pathlib import Path
 import os
-import time
 
-# ----------------------- Portal Detection ----------------------- #
-def detect_portal(url):
-    if "workable.com" in url:
-        return "workable"
-    elif "greenhouse.io" in url:
-        return "greenhouse"
-    elif "lever.co" in url:
-        return "lever"
-    elif "linkedin.com" in url:
-        return "linkedin"
-    elif url.startswith("file://") or "felig_form.html" in url:
-        return "felig"
-    else:
-        return "unsupported"
+# ----------------------- Portal Handlers ----------------------- #
+# Every portal is described in portal_specs.PORTAL_SPECS and filled by the
+# shared engine. Selenium is only imported once a form is actually filled
+# in a browser.
+def fill_form(driver, url, spec, resume_path, user_info, portal, review=False):
+    from form_filling import fill_form
+    return fill_form(driver, url, spec, resume_path, user_info, portal, review)
 
-# ----------------------- Workable Handler ----------------------- #
-def apply_to_workable(driver, url, resume_path, user_info):
-    driver.get(url)
-    wait = WebDriverWait(driver, 10)
+def portal_handler(portal):
+    """Browser fill `handler(driver, url, resume_path, user_info, review)` for `portal`, or None."""
+    if portal not in PORTAL_SPECS:
+        return None
 
-    try:
-        wait.until(EC.presence_of_element_located((By.NAME, "candidate[first_name]"))).send_keys(user_info['first_name'])
-        driver.find_element(By.NAME, "candidate[last_name]").send_keys(user_info['last_name'])
-        driver.find_element(By.NAME, "candidate[email]").send_keys(user_info['email'])
-        driver.find_element(By.CSS_SELECTOR, "input[type='file']").send_keys(resume_path)
-
-        try:
-            driver.find_element(By.NAME, "candidate[cover_letter]").send_keys(user_info['cover_letter'])
-        except NoSuchElementException:
-            print("ℹ️ No cover letter field present on Workable.")
-
-        print("✅ Workable form filled (but not submitted)")
-        time.sleep(5)
-    except Exception as e:
-        print(f"❌ Error applying to Workable: {e}")
-
-# ----------------------- Greenhouse Handler ----------------------- #
-def apply_to_greenhouse(driver, url, resume_path, user_info):
-    driver.get(url)
-    wait = WebDriverWait(driver, 10)
-
-    try:
-        wait.until(EC.presence_of_element_located((By.ID, "first_name"))).send_keys(user_info['first_name'])
-        driver.find_element(By.ID, "last_name").send_keys(user_info['last_name'])
-        driver.find_element(By.ID, "email").send_keys(user_info['email'])
-        driver.find_element(By.ID, "resume").send_keys(resume_path)
-
-        try:
-            driver.find_element(By.ID, "job_application_cover_letter").send_keys(user_info['cover_letter'])
-        except NoSuchElementException:
-            print("ℹ️ No cover letter field present on Greenhouse.")
-
-        print("✅ Greenhouse form filled (but not submitted)")
-        time.sleep(5)
-    except Exception as e:
-        print(f"❌ Error applying to Greenhouse: {e}")
-
-# ----------------------- Lever Handler ----------------------- #
-def apply_to_lever(driver, url, resume_path, user_info):
-    driver.get(url)
-    wait = WebDriverWait(driver, 10)
-
-    try:
-        wait.until(EC.presence_of_element_located((By.NAME, "name"))).send_keys(f"{user_info['first_name']} {user_info['last_name']}")
-        driver.find_element(By.NAME, "email").send_keys(user_info['email'])
-        driver.find_element(By.NAME, "phone").send_keys(user_info.get('phone', '123-456-7890'))
-        driver.find_element(By.NAME, "resume").send_keys(resume_path)
-
-        try:
-            driver.find_element(By.NAME, "comments").send_keys(user_info['cover_letter'])
-        except NoSuchElementException:
-            print("ℹ️ No cover letter field present on Lever.")
-
-        print("✅ Lever form filled (but not submitted)")
-        time.sleep(5)
-    except Exception as e:
-        print(f"❌ Error applying to Lever: {e}")
-
-# ----------------------- LinkedIn Handler ----------------------- #
-def apply_to_linkedin(driver, url, resume_path, user_info):
-    driver.get(url)
-    print("🔐 LinkedIn support requires login and additional steps. Skipped for now.")
-    time.sleep(5)
-
-# ----------------------- Felig Local Form Handler ----------------------- #
-def apply_to_felig(driver, url, resume_path, user_info):
-    driver.get(url)
-    wait = WebDriverWait(driver, 10)
-
-    try:
-        wait.until(EC.presence_of_element_located((By.NAME, "firstname"))).send_keys(user_info['first_name'])
-        driver.find_element(By.NAME, "lastname").send_keys(user_info['last_name'])
-        driver.find_element(By.NAME, "email").send_keys(user_info['email'])
-        driver.find_element(By.ID, "resumeUpload").send_keys(resume_path)
-        driver.find_element(By.NAME, "message").send_keys(user_info['cover_letter'])
-
-        print("✅ Felig form filled successfully (not submitted)")
-        time.sleep(5)
-    except Exception as e:
-        print(f"❌ Error filling Felig form: {e}")
+    def handler(driver, url, resume_path, user_info, review=False):
+        return fill_form(driver, url, PORTAL_SPECS[portal], resume_path, user_info, portal, review)
+    return handler
 
 # ----------------------- Main Router ----------------------- #
-def route_application(url, resume_path, user_info):
-    portal = detect_portal(url)
-    driver = webdriver.Chrome()
+def route_application(url, resume_path, user_info, pool=None, review=False, backend="auto"):
+    """Fill the application form at `url` and return a FillResult (never submits).
 
-    try:
-        if portal == "workable":
-            apply_to_workable(driver, url, resume_path, user_info)
-        elif portal == "greenhouse":
-            apply_to_greenhouse(driver, url, resume_path, user_info)
-        elif portal == "lever":
-            apply_to_lever(driver, url, resume_path, user_info)
-        elif portal == "linkedin":
-            apply_to_linkedin(driver, url, resume_path, user_info)
-        elif portal == "felig":
-            apply_to_felig(driver, url, resume_path, user_info)
+    backend="auto" skips the browser for portals whose spec says no
+    JavaScript is needed (unless a human review was requested).
+    """
+    portal = detect_portal(url)
+    spec = PORTAL_SPECS.get(portal)
+    handler = portal_handler(portal)
+    if spec is None or handler is None:
+        from form_filling import FillResult
+        print(f"❌ Unsupported job portal: {url}")
+        return FillResult(portal, error=f"Unsupported job portal: {url}").finish()
+
+    with span("portal.fill", portal=portal) as attrs:
+        if backend == "http" or (backend == "auto" and not spec.get("requires_js", True) and not review):
+            from http_form_backend import apply_via_http
+            result = apply_via_http(url, spec, resume_path, user_info, portal)
         else:
-            print(f"❌ Unsupported job portal: {url}")
-    finally:
-        driver.quit()
+            from driver_pool import get_driver_pool
+            pool = pool or get_driver_pool()
+            with pool.lease() as driver:
+                result = handler(driver, url, resume_path, user_info, review)
+        attrs.update(backend=result.backend, ok=result.ok)
+    count("applications.filled" if result.ok else "applications.failed")
+
+    print(f"📋 {result.summary()}")
+    return result
+
+def route_applications(applications, pool=None, workers=None, review=False):
+    """Fill many forms in parallel, one pooled driver per worker.
+
+    `applications` is an iterable of (url, resume_path, user_info) tuples and
+    is consumed lazily, so it can be fed by a streaming generation stage.
+    Items after the third (e.g. a batch index) are not passed to the handler
+    and come back untouched with the result. Yields (application, result,
+    error) as each one finishes: `result` is the FillResult, `error` an
+    exception that escaped the handler (else None).
+    """
+    from driver_pool import get_driver_pool
+    pool = pool or get_driver_pool()
+    workers = workers or pool.size
+    applications = iter(applications)
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def top_up():
+            while len(in_flight) < workers:
+                try:
+                    application = next(applications)
+                except StopIteration:
+                    return
+                in_flight[executor.submit(bind_context(route_application), *application[:3], pool=pool,
+                                         review=review)] = application
+
+        top_up()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                yield in_flight.pop(future), (None if error else future.result()), error
+            top_up()
 
 # ----------------------- Sample Run ----------------------- #
 if __name__ == '__main__':
@@ -137,6 +93,7 @@ if __name__ == '__main__':
         "cover_letter": "This is a test cover letter generated for a job application bot."
     }
     resume_path = os.path.abspath("data/user_resume.pdf")
-    sample_url = "file:///C:/Users/user/Desktop/felig_form.html"  # Replace with your actual path
+    sample_url = Path(__file__).with_name("mock_form.html").resolve().as_uri()
 
-    route_application(sample_url, resume_path, sample_user_info)
+    result = route_application(sample_url, resume_path, sample_user_info)
+    print(result)
@@ -0,0 +1,168 @@
+# portal_specs.py (declarative application form specs per job portal)
+from functools import lru_cache
+from urllib.parse import urlsplit
+import json
+import os
+
+# Each spec describes one portal's application form as data:
+#   label        display name used in messages
+#   hosts        hostname suffixes that identify the portal ("lever.co"
+#                matches jobs.lever.co but not notlever.co)
+#   paths        optional file names that identify a self-hosted form
+#   schemes      optional URL schemes routed to the portal (e.g. "file")
+#   ready        CSS selector that signals the form has rendered
+#   form         CSS selector of the <form> (validation and review)
+#   fields       ordered list of {name, selector, value | upload, optional}
+#                `value` is a str.format template over user_info;
+#                `upload` names a file (currently "resume")
+#   requires_js  False when the form is plain HTML and can be posted directly
+#   login_required  portal cannot be filled without an authenticated session
+#   done         optional CSS selector shown once a single-page form submits
+#
+# Extra portals can be added without code by dropping a JSON file with the
+# same shape at PORTAL_SPECS_FILE (default: portal_specs.json).
+
+PORTAL_SPECS_FILE = os.getenv("PORTAL_SPECS_FILE", "portal_specs.json")
+
+USER_DEFAULTS = {
+    "phone": "123-456-7890",
+    "cover_letter": "",
+}
+
+PORTAL_SPECS = {
+    "workable": {
+        "label": "Workable",
+        "hosts": ["workable.com"],
+        "paths": ["mock_workable_form.html"],
+        "ready": "[name='candidate[first_name]']",
+        "form": "form",
+        "fields": [
+            {"name": "first_name", "selector": "[name='candidate[first_name]']", "value": "{first_name}"},
+            {"name": "last_name", "selector": "[name='candidate[last_name]']", "value": "{last_name}"},
+            {"name": "email", "selector": "[name='candidate[email]']", "value": "{email}"},
+            {"name": "resume", "selector": "input[type='file']", "upload": "resume"},
+            {"name": "cover_letter", "selector": "[name='candidate[cover_letter]']", "value": "{cover_letter}", "optional": True},
+        ],
+        "requires_js": True,
+    },
+    "greenhouse": {
+        "label": "Greenhouse",
+        "hosts": ["greenhouse.io"],
+        "paths": ["mock_greenhouse_form.html"],
+        "ready": "#first_name",
+        "form": "form",
+        "fields": [
+            {"name": "first_name", "selector": "#first_name", "value": "{first_name}"},
+            {"name": "last_name", "selector": "#last_name", "value": "{last_name}"},
+            {"name": "email", "selector": "#email", "value": "{email}"},
+            {"name": "resume", "selector": "#resume", "upload": "resume"},
+            {"name": "cover_letter", "selector": "#job_application_cover_letter", "value": "{cover_letter}", "optional": True},
+        ],
+        "requires_js": True,
+    },
+    "lever": {
+        "label": "Lever",
+        "hosts": ["lever.co"],
+        "paths": ["mock_lever_form.html"],
+        "ready": "[name='name']",
+        "form": "form",
+        "fields": [
+            {"name": "name", "selector": "[name='name']", "value": "{first_name} {last_name}"},
+            {"name": "email", "selector": "[name='email']", "value": "{email}"},
+            {"name": "phone", "selector": "[name='phone']", "value": "{phone}"},
+            {"name": "resume", "selector": "[name='resume']", "upload": "resume"},
+            {"name": "cover_letter", "selector": "[name='comments']", "value": "{cover_letter}", "optional": True},
+        ],
+        "requires_js": True,
+    },
+    "linkedin": {
+        "label": "LinkedIn",
+        "hosts": ["linkedin.com"],
+        "fields": [],
+        "requires_js": True,
+        "login_required": True,
+    },
+    "felig": {
+        "label": "Felig",
+        "hosts": [],
+        "paths": ["felig_form.html"],
+        "schemes": ["file"],           # local mock forms
+        "ready": "[name='firstname']",
+        "form": "#jobAppForm",
+        "done": "#successMessage",
+        "fields": [
+            {"name": "first_name", "selector": "[name='firstname']", "value": "{first_name}"},
+            {"name": "last_name", "selector": "[name='lastname']", "value": "{last_name}"},
+            {"name": "email", "selector": "[name='email']", "value": "{email}"},
+            {"name": "resume", "selector": "#resumeUpload", "upload": "resume"},
+            {"name": "cover_letter", "selector": "[name='message']", "value": "{cover_letter}"},
+        ],
+        "requires_js": False,
+    },
+}
+
+class _UserValues(dict):
+    def __missing__(self, key):
+        return ""
+
+def field_value(field, user_info):
+    """Render a text field's value template against user_info (plus defaults)."""
+    values = _UserValues(USER_DEFAULTS)
+    values.update({k: v for k, v in user_info.items() if v is not None})
+    return field["value"].format_map(values)
+
+def load_portal_specs(path=PORTAL_SPECS_FILE):
+    """Merge portal specs from a JSON file into PORTAL_SPECS (if the file exists)."""
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            extra = json.load(f)
+        for name, spec in extra.items():
+            spec.setdefault("label", name.title())
+            spec.setdefault("hosts", [])
+            spec.setdefault("fields", [])
+            spec.setdefault("form", "form")
+            spec.setdefault("requires_js", True)
+            PORTAL_SPECS[name] = spec
+    build_portal_index()
+    return PORTAL_SPECS
+
+# -------------------- Portal Detection -------------------- #
+_host_index = {}       # host suffix -> portal
+_path_index = {}       # file name -> portal
+_scheme_index = {}     # URL scheme -> portal
+
+def build_portal_index():
+    """Rebuild the lookup tables from PORTAL_SPECS; call after changing specs."""
+    _host_index.clear()
+    _path_index.clear()
+    _scheme_index.clear()
+    for portal, spec in PORTAL_SPECS.items():
+        for host in spec.get("hosts", []):
+            _host_index[host.lower().strip(".")] = portal
+        for name in spec.get("paths", []):
+            _path_index[name] = portal
+        for scheme in spec.get("schemes", []):
+            _scheme_index[scheme] = portal
+    portal_for_host.cache_clear()
+
+@lru_cache(maxsize=4096)
+def portal_for_host(host):
+    """Longest matching host suffix, one dict lookup per label."""
+    labels = host.lower().rstrip(".").split(".")
+    for i in range(len(labels)):
+        portal = _host_index.get(".".join(labels[i:]))
+        if portal:
+            return portal
+    return None
+
+def detect_portal(url):
+    """Portal name for `url`, or "unsupported"."""
+    parts = urlsplit((url or "").strip())
+    portal = portal_for_host(parts.hostname) if parts.hostname else None
+    if portal is None:
+        portal = _path_index.get(parts.path.rsplit("/", 1)[-1])
+    if portal is None:
+        portal = _scheme_index.get(parts.scheme.lower())
+    return portal or "unsupported"
+
+load_portal_specs()
@@ -0,0 +1,163 @@
+# prompt_builder.py (compact, token-budgeted prompt inputs)
+from collections import defaultdict
+from functools import lru_cache
+import re
+import threading
+from instrumentation import count, span
+from job_ranking import tokenize
+from resume_ingest import split_sections
+
+# -------------------- CONFIG -------------------- #
+COVER_LETTER_RESUME_BUDGET = 700       # tokens of resume per cover letter prompt
+TAILOR_RESUME_BUDGET = 1500            # tailoring rewrites the resume, so keep more of it
+JOB_DESCRIPTION_BUDGET = 600
+CHARS_PER_TOKEN = 4
+
+# Sections kept first when no job description is available to rank lines against.
+SECTION_PRIORITY = ["header", "summary", "skills", "experience", "projects", "certifications", "education", "languages"]
+
+_SPACES = re.compile(r"[ \t ]+")
+_BULLETS = re.compile(r"^[•·\-*–▪●◦]+\s*")
+
+# -------------------- Token Counting -------------------- #
+@lru_cache(maxsize=8)
+def _encoding(model):
+    try:
+        import tiktoken
+    except ImportError:      # optional: fall back to the ~4 chars/token estimate
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        # Unknown model names, or the BPE file cannot be downloaded offline.
+        try:
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            return None
+
+def tokenizer_name(model="gpt-4"):
+    """The encoding count_tokens uses for `model`, or "estimate" without tiktoken."""
+    encoding = _encoding(model)
+    return encoding.name if encoding is not None else "estimate"
+
+def count_tokens(text, model="gpt-4"):
+    encoding = _encoding(model)
+    if encoding is None:
+        return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_tokens(text, budget, model="gpt-4"):
+    """Cut `text` to at most `budget` tokens, preferring a line or word boundary."""
+    if count_tokens(text, model) <= budget:
+        return text
+    encoding = _encoding(model)
+    if encoding is None:
+        cut = text[:budget * CHARS_PER_TOKEN]
+    else:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:budget])
+    if text[len(cut):len(cut) + 1].isspace():
+        return cut
+    boundary = max(cut.rfind("\n"), cut.rfind(" "))
+    return cut[:boundary] if boundary > len(cut) // 2 else cut
+
+# -------------------- Resume Compaction -------------------- #
+def normalize_lines(text):
+    """Strip layout whitespace and bullets, and drop empty or repeated lines."""
+    lines, seen = [], set()
+    for raw in (text or "").splitlines():
+        line = _SPACES.sub(" ", raw).strip()
+        key = _BULLETS.sub("", line).lower()
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+def _relevance(line, job_terms):
+    terms = set(tokenize(line))
+    return len(terms & job_terms) / (len(terms) ** 0.5) if terms else 0.0
+
+def compact_resume(resume_text, job_description=None, budget=COVER_LETTER_RESUME_BUDGET, model="gpt-4"):
+    """Deduplicated resume text that fits in `budget` tokens.
+
+    When the resume is over budget, lines are kept by overlap with the job
+    description's terms (or by section priority when there is none), and
+    re-emitted in their original order under their section headings. The
+    header (name and contact details) is always kept first.
+    """
+    sections = split_sections("\n".join(normalize_lines(resume_text)))
+    text = _join_sections(sections)
+    if count_tokens(text, model) <= budget:
+        return text
+
+    job_terms = set(tokenize(job_description))
+    order = {name: rank for rank, name in enumerate(SECTION_PRIORITY)}
+    candidates = []
+    for name, body in sections.items():
+        for index, line in enumerate(body.splitlines()):
+            rank = -1 if name == "header" else order.get(name, len(order))
+            score = _relevance(line, job_terms) if job_terms and name != "header" else 0.0
+            candidates.append((rank == -1, score, -rank, -index, name, index, line))
+    candidates.sort(reverse=True)
+
+    kept = defaultdict(dict)
+    used = 0
+    for *_, name, index, line in candidates:
+        cost = count_tokens(line, model) + 1
+        if name not in kept:
+            cost += count_tokens(name, model) + 1
+        if used + cost > budget:
+            continue
+        kept[name][index] = line
+        used += cost
+    return _join_sections({
+        name: "\n".join(line for _, line in sorted(kept[name].items()))
+        for name in sections if name in kept
+    })
+
+def _join_sections(sections):
+    parts = []
+    for name, body in sections.items():
+        parts.append(body if name == "header" else f"{name.title()}:\n{body}")
+    return "\n\n".join(parts)
+
+def compact_job_description(job_description, budget=JOB_DESCRIPTION_BUDGET, model="gpt-4"):
+    return truncate_tokens("\n".join(normalize_lines(job_description)), budget, model)
+
+# -------------------- Reporting -------------------- #
+_stats = defaultdict(lambda: {"calls": 0, "tokens": 0})
+_stats_lock = threading.Lock()
+
+def record_prompt(kind, prompt, model="gpt-4"):
+    """Count the tokens of one outgoing prompt and add them to the per-kind totals.
+
+    Each call is also a `prompt.<kind>` span carrying its token count, so
+    per-prompt sizes land in the run's trace export instead of on stdout.
+    """
+    with span(f"prompt.{kind}", model=model) as attrs:
+        tokens = attrs["tokens"] = count_tokens(prompt, model)
+    with _stats_lock:
+        _stats[kind]["calls"] += 1
+        _stats[kind]["tokens"] += tokens
+    count(f"prompt.{kind}.calls")             # per-run totals, see prompt_stats(counters)
+    count(f"prompt.{kind}.tokens", tokens)
+    return tokens
+
+def prompt_stats(counters=None):
+    """{kind: {calls, tokens, avg_tokens}} for prompts recorded in this process.
+
+    Pass a tracer's `counters()` to get the totals of just that run.
+    """
+    if counters is None:
+        with _stats_lock:
+            totals = {kind: dict(values) for kind, values in _stats.items()}
+    else:
+        totals = defaultdict(lambda: {"calls": 0, "tokens": 0})
+        for name, value in counters.items():
+            prefix, _, field = name.rpartition(".")
+            if name.startswith("prompt.") and field in ("calls", "tokens"):
+                totals[prefix[len("prompt."):]][field] = value
+    return {
+        kind: {**values, "avg_tokens": values["tokens"] / values["calls"]}
+        for kind, values in totals.items() if values["calls"]
+    }
@@ -0,0 +1,151 @@
+# resume_ingest.py (shared, cached resume text extraction)
+from collections import Counter
+from instrumentation import span
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+
+# -------------------- CONFIG -------------------- #
+RESUME_CACHE_DIR = os.path.join(".cache", "resumes")
+CACHE_FORMAT_VERSION = 1
+
+SECTION_HEADINGS = {
+    "summary": ["summary", "profile", "professional summary", "objective", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment history", "work history"],
+    "education": ["education", "academic background", "qualifications"],
+    "skills": ["skills", "technical skills", "core competencies", "key skills", "tools", "technologies"],
+    "projects": ["projects", "selected projects", "key projects"],
+    "certifications": ["certifications", "certificates", "licenses", "licenses & certifications"],
+    "languages": ["languages"],
+}
+_HEADING_LOOKUP = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_SKILL_SPLIT = re.compile(r"[,;•|·\n]+|\s{2,}")
+_SPACES = re.compile(r"[ \t\u00a0]+")
+
+# -------------------- Hashing -------------------- #
+def _open_source(source):
+    # Accepts a path, raw bytes or a binary file-like object.
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if isinstance(source, (str, os.PathLike)):
+        if os.path.getsize(source) == 0:
+            raise ValueError(f"🚫 Error: {source} is empty.")
+        return open(source, "rb")
+    source.seek(0)
+    return source
+
+def content_hash(stream, chunk_size=1 << 16):
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+# -------------------- Extraction -------------------- #
+def iter_page_texts(stream):
+    """Yield each page's text in order, one page at a time.
+
+    Pages that PyPDF2 cannot extract (scanned images, empty pages) yield "".
+    """
+    import PyPDF2            # deferred: cache hits and split_sections() never need it
+    reader = PyPDF2.PdfReader(stream)
+    for index in range(len(reader.pages)):
+        yield reader.pages[index].extract_text() or ""
+
+def normalize_pages(pages):
+    """Collapse layout whitespace and drop page headers/footers repeated after page one."""
+    page_lines = []
+    for page in pages:
+        lines = [_SPACES.sub(" ", line).strip() for line in page.splitlines()]
+        page_lines.append([line for line in lines if line])
+    if len(page_lines) >= 3:
+        seen_on = Counter(line for lines in page_lines for line in set(lines))
+        repeated = {line for line, count in seen_on.items() if count >= len(page_lines) / 2 and len(line) < 80}
+        # Keep the first occurrence (often the name/contact block), drop the echoes.
+        page_lines = [page_lines[0]] + [[line for line in lines if line not in repeated] for lines in page_lines[1:]]
+    return "\n".join("\n".join(lines) for lines in page_lines if lines)
+
+# -------------------- Sections & Skills -------------------- #
+def _heading_for(line):
+    key = line.strip().rstrip(":").lower()
+    if len(key) > 40:
+        return None
+    return _HEADING_LOOKUP.get(key)
+
+def split_sections(text):
+    sections = {}
+    current = "header"
+    for line in text.splitlines():
+        heading = _heading_for(line)
+        if heading:
+            current = heading
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items() if any(lines)}
+
+def extract_skills(sections):
+    skills = []
+    seen = set()
+    for item in _SKILL_SPLIT.split(sections.get("skills", "")):
+        skill = item.strip(" -*:.")
+        if skill and len(skill) <= 40 and skill.lower() not in seen:
+            seen.add(skill.lower())
+            skills.append(skill)
+    return skills
+
+# -------------------- Cached Loader -------------------- #
+def _cache_path(digest, cache_dir):
+    return os.path.join(cache_dir, f"{digest}.json")
+
+def load_resume(source, cache_dir=RESUME_CACHE_DIR):
+    """Return {hash, pages, text, sections, skills} for a PDF resume.
+
+    `source` is a path, raw bytes or a binary file. Results are cached on
+    disk by the file's content hash, so each resume is parsed only once no
+    matter which entry point (CLI, agent UI, bot GUI) sees it first.
+    """
+    stream = _open_source(source)
+    try:
+        digest = content_hash(stream)
+        path = _cache_path(digest, cache_dir)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("version") == CACHE_FORMAT_VERSION:
+                return cached
+
+        with span("resume.parse"):
+            pages = list(iter_page_texts(stream))
+            text = normalize_pages(pages)
+    finally:
+        if stream is not source:
+            stream.close()
+
+    sections = split_sections(text)
+    resume = {
+        "version": CACHE_FORMAT_VERSION,
+        "hash": digest,
+        "pages": len(pages),
+        "text": text,
+        "sections": sections,
+        "skills": extract_skills(sections),
+    }
+    os.makedirs(cache_dir, exist_ok=True)
+    # A unique temp file per writer: two threads may ingest the same resume at once.
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=cache_dir, suffix=".tmp", delete=False) as f:
+        tmp_path = f.name
+        try:
+            json.dump(resume, f)
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+    return resume
+
+def extract_resume_text(source):
+    return load_resume(source)["text"]
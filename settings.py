@@ -0,0 +1,94 @@
+# settings.py (configuration resolved once, without importing heavy dependencies)
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+import os
+import sys
+import threading
+import tomllib
+
+# -------------------- CONFIG -------------------- #
+# Same files Streamlit reads; the project file wins over the global one.
+SECRETS_FILES = [Path.home() / ".streamlit" / "secrets.toml", Path(".streamlit") / "secrets.toml"]
+
+@dataclass(frozen=True)
+class Settings:
+    openai_api_key: str = None
+    openai_api_base: str = None       # point at a local fake server for testing
+    api_key_source: str = None        # "secrets", "env" or None, for diagnostics
+
+    def describe(self):
+        if not self.openai_api_key:
+            return "🔐 No OpenAI API key configured (set OPENAI_API_KEY or .streamlit/secrets.toml)"
+        return f"🔐 API Key Loaded from {self.api_key_source}: …{self.openai_api_key[-4:]}"
+
+# -------------------- Resolution -------------------- #
+def _load_dotenv():
+    try:
+        from dotenv import load_dotenv
+    except ImportError:      # optional: plain environment variables still work
+        return
+    load_dotenv()
+
+def _streamlit_secrets():
+    """The [openai] secrets table, or {} when there is none.
+
+    Inside a running Streamlit app st.secrets is used as is. Anywhere else
+    the secrets files are read directly, so a CLI or batch run never pays
+    for importing Streamlit just to look up a key.
+    """
+    if "streamlit" in sys.modules:
+        try:
+            return dict(sys.modules["streamlit"].secrets.get("openai", {}))
+        except Exception:    # no secrets file, or not running under `streamlit run`
+            return {}
+    table = {}
+    for path in SECRETS_FILES:
+        try:
+            with open(path, "rb") as f:
+                table.update(tomllib.load(f).get("openai", {}))
+        except (OSError, tomllib.TOMLDecodeError):
+            continue
+    return table
+
+@lru_cache(maxsize=1)
+def get_settings():
+    """Resolve configuration once per process: Streamlit secrets, then .env / environment."""
+    _load_dotenv()
+    secrets = _streamlit_secrets()
+    if secrets.get("api_key"):
+        api_key, source = secrets["api_key"], "secrets"
+    elif os.getenv("OPENAI_API_KEY"):
+        api_key, source = os.getenv("OPENAI_API_KEY"), "env"
+    else:
+        api_key, source = None, None
+    api_base = os.getenv("OPENAI_API_BASE") or secrets.get("api_base")
+    return Settings(openai_api_key=api_key, openai_api_base=api_base, api_key_source=source)
+
+# -------------------- OpenAI Client -------------------- #
+_openai_lock = threading.Lock()
+_openai_configured = False
+
+def configure_openai():
+    """Import the openai package on first use and apply the settings to it."""
+    global _openai_configured
+    import openai
+    if _openai_configured:
+        return openai
+    with _openai_lock:
+        if not _openai_configured:
+            settings = get_settings()
+            print(settings.describe())
+            if settings.openai_api_key:
+                openai.api_key = settings.openai_api_key
+            if settings.openai_api_base:
+                openai.api_base = settings.openai_api_base
+            _openai_configured = True
+    return openai
+
+def reset_settings():
+    """Forget the resolved settings (e.g. after changing the environment in a test or benchmark)."""
+    global _openai_configured
+    get_settings.cache_clear()
+    with _openai_lock:
+        _openai_configured = False